@@ -0,0 +1,18 @@
+# app/apps.py
+from django.apps import AppConfig
+
+
+class MainAppConfig(AppConfig):
+    name = 'app'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        from app.middleware.initial_setup import user_deleted, user_saved, user_saving
+
+        # Keep the cached "a superuser exists" answer honest
+        user_model = get_user_model()
+        pre_save.connect(user_saving, sender=user_model, dispatch_uid='initial_setup_user_saving')
+        post_save.connect(user_saved, sender=user_model, dispatch_uid='initial_setup_user_saved')
+        post_delete.connect(user_deleted, sender=user_model, dispatch_uid='initial_setup_user_deleted')
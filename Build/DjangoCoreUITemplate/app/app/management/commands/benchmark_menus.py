@@ -0,0 +1,333 @@
+"""
+Management command for micro-benchmarking the menu system
+"""
+import gc
+import itertools
+import json
+import re
+import timeit
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+from types import SimpleNamespace
+from typing import List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from app.tests.support import LegacyMenu, build_menu_data, make_request
+from app.utilities.enums import AuthRequirement, MenuItemType
+from app.utilities.menu_manager import Menu, MenuItem, MenuManager, build_menu_overlay, get_default_menus
+from app.utilities.menu_renderer import render_menu_html
+from app.utilities.session_manager import get_session_manager
+
+
+def legacy_filter(menu: Menu, user_authenticated: bool) -> Menu:
+    """The recursive per-request filter MenuManager used before projections"""
+
+    def filter_items(items: List[MenuItem]) -> List[MenuItem]:
+        filtered = []
+        for item in sorted(items, key=lambda x: x.order):
+            if (
+                (item.auth_requirement == AuthRequirement.ALL)
+                or (user_authenticated and item.auth_requirement == AuthRequirement.AUTH_ONLY)
+                or (not user_authenticated and item.auth_requirement == AuthRequirement.UNAUTH_ONLY)
+            ):
+                if item.item_type == MenuItemType.DROPDOWN:
+                    filtered_nested = filter_items(item.items)
+                    if filtered_nested:
+                        filtered.append(MenuItem(
+                            id=item.id,
+                            item_type=item.item_type,
+                            menu_text=item.menu_text,
+                            menu_class=item.menu_class,
+                            url=item.url,
+                            auth_requirement=item.auth_requirement,
+                            icon=item.icon,
+                            icon_class=item.icon_class,
+                            alt_icon=item.alt_icon,
+                            alt_icon_class=item.alt_icon_class,
+                            alt_status=item.alt_status,
+                            secondary_text=item.secondary_text,
+                            secondary_class=item.secondary_class,
+                            new_window=item.new_window,
+                            order=item.order,
+                            items=filtered_nested,
+                        ))
+                else:
+                    filtered.append(item)
+        return filtered
+
+    return Menu(menu_id=menu.menu_id, items=filter_items(menu.items))
+
+
+# The per-item sidebar template that render_sidebar_menu_item included for each item
+LEGACY_SIDEBAR_ITEM = """
+{% if item.auth_requirement == 'all' or item.auth_requirement == 'auth_only' and user.is_authenticated or item.auth_requirement == 'unauth_only' and not user.is_authenticated %}
+    {% if item.item_type == 'header' %}
+        <li class="nav-title">{{ item.menu_text }}</li>
+    {% elif item.item_type == 'separator' %}
+        <li class="nav-divider"></li>
+    {% elif item.item_type == 'link' or item.item_type == 'altlink' %}
+        <li class="nav-item">
+            <a class="nav-link" href="{{ item.url }}">
+                {% if item.icon %}
+                    <svg class="nav-icon {% if item.alt_status %}{{ item.alt_icon_class }}{% endif %}">
+                        <use xlink:href="{{ item.icon }}"></use>
+                    </svg>
+                {% endif %}
+                {{ item.menu_text }}
+                {% if item.secondary_text %}
+                    <span class="{{ item.secondary_class }}">{{ item.secondary_text }}</span>
+                {% endif %}
+            </a>
+        </li>
+    {% elif item.item_type == 'dropdown' %}
+        <li class="nav-group">
+            <a class="nav-link nav-group-toggle" href="#">
+                {% if item.icon %}
+                    <svg class="nav-icon">
+                        <use xlink:href="{{ item.icon }}"></use>
+                    </svg>
+                {% endif %}
+                {{ item.menu_text }}
+            </a>
+            <ul class="nav-group-items compact">
+                {% for subitem in item.items %}
+                    {% if subitem.item_type == 'link' %}
+                        <li class="nav-item">
+                            <a class="nav-link" href="{{ subitem.url }}">
+                                <span class="nav-icon"><span class="nav-icon-bullet"></span></span>
+                                {{ subitem.menu_text }}
+                                {% if subitem.secondary_text %}
+                                    <span class="{{ subitem.secondary_class }}">{{ subitem.secondary_text }}</span>
+                                {% endif %}
+                            </a>
+                        </li>
+                    {% endif %}
+                {% endfor %}
+            </ul>
+        </li>
+    {% endif %}
+{% endif %}
+"""
+
+
+def legacy_render(item_template, menu: Menu, user) -> str:
+    """The sidebar loop: one template context and render per top-level item"""
+    return ''.join(item_template.render({'item': item, 'user': user}) for item in menu.items)
+
+
+def normalize_html(html: str) -> str:
+    """Collapse insignificant whitespace so renderers can be compared"""
+    html = re.sub(r'\s+', ' ', html)
+    html = re.sub(r'\s*(<|>)\s*', r'\1', html)
+    return re.sub(r'\s+"', '"', html).strip()
+
+
+def legacy_post_init(item):
+    """The MenuItem enum conversion used before interning"""
+    if isinstance(item.item_type, str):
+        for enum_member in MenuItemType:
+            if enum_member.value == item.item_type.lower():
+                item.item_type = enum_member
+                break
+    if isinstance(item.auth_requirement, str):
+        for enum_member in AuthRequirement:
+            if enum_member.value == item.auth_requirement.lower():
+                item.auth_requirement = enum_member
+                break
+
+
+def plain_dataclass(cls):
+    """Copy a slotted dataclass as a regular __dict__-backed dataclass without interning"""
+    specs = []
+    for f in fields(cls):
+        kwargs = {'repr': f.repr, 'compare': f.compare}
+        if f.default is not MISSING:
+            kwargs['default'] = f.default
+        if f.default_factory is not MISSING:
+            kwargs['default_factory'] = f.default_factory
+        specs.append((f.name, f.type, field(**kwargs)))
+    return make_dataclass(f'Plain{cls.__name__}', specs, namespace={'__post_init__': legacy_post_init})
+
+
+def flat_item_fields(menu_data: dict) -> List[dict]:
+    """Get every item's fields (without children) from a menu dict"""
+    flat = []
+
+    def walk(items):
+        for item in items:
+            flat.append({key: value for key, value in item.items() if key != 'items'})
+            walk(item.get('items', []))
+
+    walk(menu_data['items'])
+    return flat
+
+
+def measure_items(item_class, payload: str) -> float:
+    """Bytes retained per item built from a freshly decoded JSON payload"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    decoded = json.loads(payload)  # Like a session load: fresh strings per item
+    items = [item_class(**data) for data in decoded]
+    del decoded
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return retained / len(items)
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark the menu system on a large nested menu'
+    sections = ['filter', 'edit', 'memory', 'load', 'render']
+
+    def add_arguments(self, parser):
+        parser.add_argument('sections', nargs='*', help=f"Sections to run: {', '.join(self.sections)} (default all)")
+        parser.add_argument('--items', type=int, default=500, help='Total menu items (default 500)')
+        parser.add_argument('--iterations', type=int, default=200, help='Calls per measurement (default 200)')
+
+    def report(self, label, seconds, iterations):
+        per_call = seconds / iterations * 1e6
+        self.stdout.write(f"  {label:<40} {per_call:>12.2f} us/call")
+        return per_call
+
+    def handle(self, *args, **options):
+        for section in options['sections'] or self.sections:
+            if section not in self.sections:
+                self.stdout.write(self.style.ERROR(f"Unknown section '{section}'"))
+                continue
+            getattr(self, f'benchmark_{section}')(options['items'], options['iterations'])
+
+    def benchmark_filter(self, item_count, iterations):
+        menu = Menu.from_dict(build_menu_data(item_count))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Menu filtering: {item_count} items, {iterations} iterations"
+        ))
+        for user_authenticated in (True, False):
+            # Both implementations must show the same items
+            expected = [item.to_dict() for item in legacy_filter(menu, user_authenticated).items]
+            actual = [item.to_dict() for item in menu.visible_to(user_authenticated).items]
+            if expected != actual:
+                self.stdout.write(self.style.ERROR('Projection differs from legacy filter'))
+                return
+
+            state = 'authenticated' if user_authenticated else 'anonymous'
+            self.stdout.write(f"{state}:")
+            legacy = self.report(
+                'legacy recursive filter',
+                timeit.timeit(lambda: legacy_filter(menu, user_authenticated), number=iterations),
+                iterations,
+            )
+
+            def build_projection():
+                menu.mark_dirty()
+                return menu.visible_to(user_authenticated)
+
+            self.report(
+                'projection rebuild (after mark_dirty)',
+                timeit.timeit(build_projection, number=iterations),
+                iterations,
+            )
+            served = self.report(
+                'projection lookup (warm)',
+                timeit.timeit(lambda: menu.visible_to(user_authenticated), number=iterations),
+                iterations,
+            )
+            self.stdout.write(f"  speedup: {legacy / served:,.0f}x")
+
+    def benchmark_edit(self, item_count, iterations):
+        menu = Menu.from_dict(build_menu_data(item_count))
+        request = make_request()
+        request.session.update({'menu_overlay': {menu.menu_id: build_menu_overlay(None, menu)}, 'menu_version': 1})
+        manager = MenuManager(get_session_manager(request))
+        item_id = menu.items[-1].items[-1].id if menu.items[-1].items else menu.items[-1].id
+        badges = itertools.count()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Badge edit and serve: {item_count} items, {iterations} iterations"
+        ))
+        for user_authenticated in (True, False):
+            state = 'authenticated' if user_authenticated else 'anonymous'
+            self.stdout.write(f"{state}:")
+            self.report(
+                'legacy recursive filter',
+                timeit.timeit(lambda: legacy_filter(menu, user_authenticated), number=iterations),
+                iterations,
+            )
+
+            def edit():
+                manager.update_item(menu.menu_id, item_id, secondary_text=str(next(badges)))
+                return manager.get_menu(menu.menu_id, user_authenticated)
+
+            self.report('update_item + get_menu', timeit.timeit(edit, number=iterations), iterations)
+
+            def full_hash():
+                menu.mark_dirty()
+                return menu.content_hash
+
+            self.report('full content hash (for reference)', timeit.timeit(full_hash, number=iterations), iterations)
+
+    def benchmark_memory(self, item_count, iterations):
+        flat = flat_item_fields(build_menu_data(item_count))
+        payload = json.dumps(flat)
+        plain_class = plain_dataclass(MenuItem)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"MenuItem memory and construction: {len(flat)} items, {iterations} iterations"
+        ))
+        before = measure_items(plain_class, payload)
+        after = measure_items(MenuItem, payload)
+        self.stdout.write(f"  {'plain dataclass':<40} {before:>12.0f} bytes/item")
+        self.stdout.write(f"  {'slotted + interned MenuItem':<40} {after:>12.0f} bytes/item")
+
+        for label, item_class in (('plain dataclass', plain_class), ('slotted + interned MenuItem', MenuItem)):
+            seconds = timeit.timeit(lambda: [item_class(**data) for data in flat], number=iterations)
+            self.report(f'construct {label}', seconds / len(flat), iterations)
+
+    def benchmark_load(self, item_count, iterations):
+        payload = Menu.from_dict(build_menu_data(item_count)).to_dict()  # As stored in a session
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Menu deserialisation: {item_count} items, {iterations} iterations"
+        ))
+        expected = LegacyMenu.from_dict(payload).to_dict()
+        for label, loader in (('Menu.from_dict', Menu.from_dict), ('Menu.from_normalized', Menu.from_normalized)):
+            if loader(payload).to_dict() != expected:
+                raise CommandError(f'{label} output differs from the legacy loader')
+
+        legacy = self.report('legacy from_dict', timeit.timeit(lambda: LegacyMenu.from_dict(payload), number=iterations), iterations)
+        self.report('Menu.from_dict', timeit.timeit(lambda: Menu.from_dict(payload), number=iterations), iterations)
+        fast = self.report('Menu.from_normalized', timeit.timeit(lambda: Menu.from_normalized(payload), number=iterations), iterations)
+        self.stdout.write(f"  speedup: {legacy / fast:.1f}x (outputs identical)")
+
+    def benchmark_render(self, item_count, iterations):
+        item_template = engines['django'].from_string(LEGACY_SIDEBAR_ITEM)
+        menus = (
+            ('default sidebar', get_default_menus()['sidebar']),
+            (f'{item_count} item sidebar', Menu.from_dict(build_menu_data(item_count))),
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Sidebar rendering: {iterations} iterations"))
+        for label, menu in menus:
+            for user_authenticated in (True, False):
+                user = SimpleNamespace(is_authenticated=user_authenticated)
+                visible = menu.visible_to(user_authenticated)
+                if normalize_html(legacy_render(item_template, visible, user)) != normalize_html(render_menu_html(visible)):
+                    self.stdout.write(self.style.ERROR(f'{label}: render_menu output differs from the inclusion-tag loop'))
+                    return
+
+                state = 'authenticated' if user_authenticated else 'anonymous'
+                self.stdout.write(f"{label}, {state}:")
+                legacy = self.report(
+                    'inclusion-tag loop',
+                    timeit.timeit(lambda: legacy_render(item_template, visible, user), number=iterations),
+                    iterations,
+                )
+                rendered = self.report(
+                    'render_menu (uncached)',
+                    timeit.timeit(lambda: render_menu_html(visible), number=iterations),
+                    iterations,
+                )
+                self.stdout.write(f"  speedup: {legacy / rendered:.1f}x (outputs equivalent)")
@@ -0,0 +1,97 @@
+"""
+Management command for micro-benchmarking the per-request plumbing
+(context processors, middleware and session handling)
+"""
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+
+from app.middleware.middleware import SettingsMiddleware
+from app.tests.support import build_menu_data, make_request, session_loaded, store_session
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark context processors, middleware and session handling'
+    sections = ['context', 'settings']
+
+    def add_arguments(self, parser):
+        parser.add_argument('sections', nargs='*', help=f"Sections to run: {', '.join(self.sections)} (default all)")
+        parser.add_argument('--items', type=int, default=500, help='Menu items stored in the benchmark session (default 500)')
+        parser.add_argument('--iterations', type=int, default=200, help='Calls per measurement (default 200)')
+
+    def report(self, label, seconds, iterations):
+        per_call = seconds / iterations * 1e6
+        self.stdout.write(f"  {label:<40} {per_call:>12.2f} us/call")
+        return per_call
+
+    def handle(self, *args, **options):
+        for section in options['sections'] or self.sections:
+            if section not in self.sections:
+                self.stdout.write(self.style.ERROR(f"Unknown section '{section}'"))
+                continue
+            getattr(self, f'benchmark_{section}')(options['items'], options['iterations'])
+
+    def benchmark_context(self, item_count, iterations):
+        session_key = store_session({'menus': {'benchmark': build_menu_data(item_count)}})
+        unused = engines['django'].from_string('<title>{{ title }}</title>')
+        used = engines['django'].from_string('{{ SESSION_DATA|length }}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Template context: session holding a {item_count} item menu, {iterations} iterations"
+        ))
+        request = make_request(session_key)
+        unused.render({'title': 'Lazy'}, request)
+        if session_loaded(request):
+            self.stdout.write(self.style.ERROR('Session was loaded for a template that does not use it'))
+            return
+        request = make_request(session_key)
+        if used.render({}, request) != '1' or not session_loaded(request):
+            self.stdout.write(self.style.ERROR('SESSION_DATA did not load the session when used'))
+            return
+        self.stdout.write('  session is only loaded when the template reads it')
+
+        def render_eager():
+            # What settings_context did before: load and copy the whole session
+            request = make_request(session_key)
+            dict(request.session)
+            return unused.render({'title': 'Lazy'}, request)
+
+        eager = self.report('render with eager session copy', timeit.timeit(render_eager, number=iterations), iterations)
+        lazy = self.report(
+            'render with lazy context',
+            timeit.timeit(lambda: unused.render({'title': 'Lazy'}, make_request(session_key)), number=iterations),
+            iterations,
+        )
+        self.stdout.write(f"  speedup: {eager / lazy:.1f}x")
+        make_request(session_key).session.delete()
+
+    def benchmark_settings(self, item_count, iterations):
+        self.stdout.write(self.style.SUCCESS(f"SettingsMiddleware: {iterations} warm requests"))
+        middleware = SettingsMiddleware(lambda request: HttpResponse())
+        try:
+            middleware(make_request())  # Warm up
+        except DatabaseError as e:
+            self.stdout.write(self.style.ERROR(f"AppSetting table unavailable ({e}); run migrate first"))
+            return
+
+        requests = []
+
+        def handle():
+            request = make_request()
+            requests.append(request)
+            return middleware(request)
+
+        with CaptureQueriesContext(connection) as queries:
+            seconds = timeit.timeit(handle, number=iterations)
+        if queries.captured_queries:
+            self.stdout.write(self.style.ERROR(f"{len(queries.captured_queries)} queries on warm requests"))
+            return
+        if any(request.session.modified for request in requests):
+            self.stdout.write(self.style.ERROR('A warm request modified the session'))
+            return
+        self.stdout.write('  0 queries and no session writes per warm request')
+        self.report('warm request', seconds, iterations)
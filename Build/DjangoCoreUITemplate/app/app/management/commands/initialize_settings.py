@@ -0,0 +1,17 @@
+"""
+Management command to create the AppSetting rows from DEFAULT_APP_SETTINGS
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.models import AppSetting
+
+
+class Command(BaseCommand):
+    help = 'Initialize app settings in the database (only when APP_SETTING_ID changed)'
+
+    def handle(self, *args, **options):
+        AppSetting.initialize_settings()
+        self.stdout.write(self.style.SUCCESS(
+            f"App settings initialized for version {settings.APP_SETTING_ID}"
+        ))
@@ -0,0 +1,27 @@
+"""
+Management command to compile every project template and report the cost
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utilities.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile every template under templates/. Workers do this themselves at start-up '
+        'when WARM_TEMPLATES is on; run this to check templates compile and to time the warm-up.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Template profile: {settings.TEMPLATE_PROFILE}")
+        cold = warm_templates()
+        self.stdout.write(self.style.SUCCESS(f"Compiled {cold.compiled} templates in {cold.seconds:.3f}s"))
+
+        warm = warm_templates()
+        self.stdout.write(f"  second pass from the cache: {warm.seconds:.3f}s")
+
+        for name, error in cold.errors:
+            self.stdout.write(self.style.ERROR(f"  {name}: {error}"))
+        if cold.errors:
+            raise CommandError(f"{len(cold.errors)} templates did not compile")
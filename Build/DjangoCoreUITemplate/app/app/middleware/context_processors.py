@@ -1,28 +1,41 @@
 # context_processors.py
 from django.conf import settings
-from app.utilities.session_manager import UserSessionManager
+from django.utils.functional import SimpleLazyObject
+from app.utilities.session_manager import get_session_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
 def settings_context(request):
-    """Make settings available in templates"""
-    try:
-        session_manager = UserSessionManager(request)
-        return {
-            'APP_SETTINGS': session_manager.get_all(),  # Changed from get_all_settings
-            'DEFAULT_APP_SETTINGS': settings.DEFAULT_APP_SETTINGS,
-            'SESSION_DATA': dict(request.session),
-            'is_using_defaults': session_manager.is_using_defaults(),
-            'active_theme': session_manager.get_theme(),
-            #'settings': settings,
-        }
-    except Exception as e:
-        logger.warning(f"Failed to initialize session manager: {e}")
-        return {
-            'APP_SETTINGS': settings.DEFAULT_APP_SETTINGS,
-            'DEFAULT_APP_SETTINGS': settings.DEFAULT_APP_SETTINGS,
-            'is_using_defaults': True,
-            'active_theme': 'dark',
-            #'settings': settings,
-        }
+    """Make settings available in templates
+
+    Every value is lazy, so the session is only loaded (and SESSION_DATA only
+    copied) when a template actually uses it.
+    """
+    def session_manager():
+        try:
+            return get_session_manager(request)
+        except Exception as e:
+            logger.warning(f"Failed to initialize session manager: {e}")
+            return None
+
+    def app_settings():
+        manager = session_manager()
+        return manager.get_all() if manager else settings.DEFAULT_APP_SETTINGS  # Changed from get_all_settings
+
+    def using_defaults():
+        manager = session_manager()
+        return manager.is_using_defaults() if manager else True
+
+    def active_theme():
+        manager = session_manager()
+        return manager.get_theme() if manager else 'dark'
+
+    return {
+        'APP_SETTINGS': SimpleLazyObject(app_settings),
+        'DEFAULT_APP_SETTINGS': settings.DEFAULT_APP_SETTINGS,
+        'SESSION_DATA': SimpleLazyObject(lambda: dict(request.session)),
+        'is_using_defaults': SimpleLazyObject(using_defaults),
+        'active_theme': SimpleLazyObject(active_theme),
+        #'settings': settings,
+    }
@@ -1,7 +1,52 @@
 # app/middleware/initial_setup.py
 from django.shortcuts import redirect
 from django.urls import reverse
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+SUPERUSER_EXISTS_CACHE_KEY = 'initial_setup:superuser_exists'
+# Only a True result is remembered, and only for this long: the user signals
+# in AppConfig.ready() clear it at once in a shared cache, but with the
+# per-process LocMemCache other workers only notice a deleted superuser when
+# their entry expires.
+SUPERUSER_EXISTS_CACHE_TIMEOUT = 60
+
+def superuser_exists():
+    """Check if any superuser exists, at most one query per cache timeout"""
+    if cache.get(SUPERUSER_EXISTS_CACHE_KEY):
+        return True
+    if get_user_model().objects.filter(is_superuser=True).exists():
+        cache.set(SUPERUSER_EXISTS_CACHE_KEY, True, SUPERUSER_EXISTS_CACHE_TIMEOUT)
+        return True
+    return False
+
+def reset_superuser_exists():
+    """Forget the cached answer so the next check queries the database"""
+    cache.delete(SUPERUSER_EXISTS_CACHE_KEY)
+
+def user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """pre_save handler: remember whether an existing user was a superuser"""
+    if raw or instance._state.adding:
+        return  # A new user can't demote anyone
+    if update_fields is not None and 'is_superuser' not in update_fields:
+        return  # e.g. the last_login update on every login
+    instance._was_superuser = (
+        sender.objects.filter(pk=instance.pk).values_list('is_superuser', flat=True).first()
+    )
+
+def user_saved(sender, instance, created, **kwargs):
+    """post_save handler: only a change to is_superuser can make the answer stale"""
+    was_superuser = getattr(instance, '_was_superuser', None)
+    instance._was_superuser = None
+    if created or was_superuser is None:
+        return
+    if was_superuser != instance.is_superuser:
+        reset_superuser_exists()
+
+def user_deleted(sender, instance, **kwargs):
+    """post_delete handler"""
+    if instance.is_superuser:
+        reset_superuser_exists()
 
 class InitialSetupMiddleware:
     def __init__(self, get_response):
@@ -13,7 +58,7 @@ class InitialSetupMiddleware:
             return self.get_response(request)
 
         # Check if any superuser exists
-        if not User.objects.filter(is_superuser=True).exists():
+        if not superuser_exists():
             return redirect('initial_setup')
 
         return self.get_response(request)
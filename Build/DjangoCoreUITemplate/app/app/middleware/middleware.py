@@ -1,12 +1,16 @@
 """
 Middleware utilities
 """
+import logging
+from django.db import DatabaseError
 from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
+from django.utils.functional import SimpleLazyObject
 from app.models import AppSetting
-from app.utilities.session_manager import UserSessionManager
+from app.utilities.session_manager import get_session_manager
 from app.utilities.menu_manager import MenuManager
-from app.utilities.request_utils import is_ajax
+from app.utilities.request_utils import is_ajax, page_info
+
+logger = logging.getLogger(__name__)
 
 class SessionToContextMiddleware:
     def __init__(self, get_response):
@@ -18,11 +22,9 @@ class SessionToContextMiddleware:
 
     def process_template_response(self, request, response):
         if hasattr(response, 'context_data'):
-            # Add the entire session to the context
+            # The session store loads on first access, so this costs nothing
+            # for templates that never read it
             response.context_data['session'] = request.session
-            
-            
-            
         return response
 
 class CacheControlMiddleware:
@@ -46,8 +48,8 @@ class MenuMiddleware(MiddlewareMixin):
 
     def __call__(self, request):
         """Process the request"""
-        session = UserSessionManager(request)
-        request.session_manager = session
+        # Built on first use and shared by the middleware, context processor and views
+        request.session_manager = SimpleLazyObject(lambda: get_session_manager(request))
 
         # If it's an AJAX request, skip the menu processing
         if not is_ajax(request):
@@ -58,18 +60,27 @@ class MenuMiddleware(MiddlewareMixin):
         return response
 
 class SettingsMiddleware:
+    """Attach the database app settings to request.app_settings
+
+    The settings are shared read-only (see AppSetting.cached_settings), so
+    requests make no queries once warm and never write the session.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
+        # Runs once when the server loads its middleware; `manage.py
+        # initialize_settings` does the same ahead of time
+        try:
+            AppSetting.initialize_settings()
+        except DatabaseError as e:
+            logger.warning(f"Could not initialize app settings: {e}")
+
     def __call__(self, request):
-        # Initialize settings if needed
-        AppSetting.initialize_settings()
-        
-        # Load settings into session
-        if not request.is_ajax():  # Skip for AJAX requests
-            session = UserSessionManager(request)
-            settings_dict = AppSetting.load_settings()
-            session['app_settings'] = settings_dict
+        # Read by UserSessionManager as the defaults users' overrides apply to
+        try:
+            request.app_settings = AppSetting.cached_settings()
+        except DatabaseError as e:  # e.g. before migrate; DEFAULT_APP_SETTINGS apply
+            logger.warning(f"Could not load app settings: {e}")
 
         response = self.get_response(request)
         return response
@@ -87,16 +98,23 @@ class BreadcrumbMiddleware:
                 # Only track '/examples/' instead of the full path
                 path = '/examples/'
             
-            session = UserSessionManager(request)
-            session.add_breadcrumb(path)
+            session = get_session_manager(request)
+            # should_track_breadcrumb resolved request.path already
+            pagetitle = request.page_info.title if path == request.path else None
+            session.add_breadcrumb(path, pagetitle)
 
         response = self.get_response(request)
+
+        # Only set when something used the session manager during this request
+        session = getattr(request, '_session_manager', None)
+        if session is not None:
+            session.write_breadcrumb_cookie(response)
         return response
     
     def process_template_response(self, request, response):
         """Add breadcrumbs to template context"""
         if hasattr(response, 'context_data'):
-            session = UserSessionManager(request)
+            session = get_session_manager(request)
             response.context_data['breadcrumbs'] = session.get_breadcrumbs()
         return response
 
@@ -124,17 +142,16 @@ class BreadcrumbMiddleware:
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return False
 
-        try:
-            # Get the resolved URL pattern
-            resolver_match = resolve(request.path)
-            
-            # Skip certain URL names (optional)
-            excluded_url_names = ['login', 'logout', 'password_reset']
-            if resolver_match.url_name in excluded_url_names:
-                return False
-                
-        except:
-            # If URL doesn't resolve, skip it
+        # Resolve once per path per process; kept on the request for later use
+        request.page_info = page_info(request.path)
+
+        # If URL doesn't resolve, skip it
+        if not request.page_info.resolved:
+            return False
+
+        # Skip certain URL names (optional)
+        excluded_url_names = ['login', 'logout', 'password_reset']
+        if request.page_info.url_name in excluded_url_names:
             return False
 
         return True
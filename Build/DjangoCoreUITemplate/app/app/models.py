@@ -1,9 +1,37 @@
 # models.py
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.cache import cache
 import json
+import logging
+import os
+import time
+from types import MappingProxyType
 from django.core.exceptions import ValidationError
 
+logger = logging.getLogger(__name__)
+
+SETTINGS_CACHE_KEY = 'app_settings'
+
+# This process's copy of the settings, as (version stamp, settings dict)
+_local_settings = (None, None)
+
+def settings_stamp():
+    """The settings version: mtime of a file every worker can see (0 if missing)"""
+    try:
+        return os.stat(settings.APP_SETTINGS_STAMP_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+def bump_settings_stamp():
+    """Move the settings version forward, invalidating every process's copy"""
+    path = settings.APP_SETTINGS_STAMP_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    stamp = max(time.time_ns(), settings_stamp() + 1)  # Strictly increasing
+    with open(path, 'a'):
+        pass
+    os.utime(path, ns=(stamp, stamp))
+
 class AppSetting(models.Model):
     setting = models.CharField(
         max_length=100, 
@@ -41,21 +69,42 @@ class AppSetting(models.Model):
             })
     
     @classmethod
-    def load_settings(cls):
-        """Load all settings into a dictionary"""
-        settings_dict = {}
-        for setting in cls.objects.all():
+    def default_instances(cls):
+        """Unsaved rows for DEFAULT_APP_SETTINGS plus setting_id, validated in Python
+
+        Does the same checks as full_clean() without clean()'s per-row
+        existence query: names are normalised and checked for duplicates
+        against the set being built, since the table is replaced as a whole.
+        """
+        defaults = {**settings.DEFAULT_APP_SETTINGS, 'setting_id': settings.APP_SETTING_ID}
+        instances = []
+        seen = set()
+        errors = {}
+        for setting, value in defaults.items():
+            instance = cls(setting=setting.lower().strip(), value=value)
+            if instance.setting in seen:
+                errors.setdefault('setting', []).append(f'Setting "{instance.setting}" is defined more than once.')
+                continue
+            seen.add(instance.setting)
             try:
-                settings_dict[setting.setting] = setting.value
-            except json.JSONDecodeError:
-                settings_dict[setting.setting] = None
-        return settings_dict
+                instance.clean_fields()
+            except ValidationError as e:
+                for field, messages in e.message_dict.items():
+                    errors.setdefault(field, []).extend(f'{setting}: {message}' for message in messages)
+                continue
+            instances.append(instance)
+
+        if errors:
+            raise ValidationError(errors)
+        return instances
 
     @classmethod
     def initialize_settings(cls):
-        """Initialize settings from settings.py if needed"""
-        from django.conf import settings
-        
+        """Initialize settings from settings.py if needed
+
+        Uses a fixed number of queries however many settings there are: one
+        to check setting_id, then a delete and a bulk insert.
+        """
         try:
             # Check if settings need to be initialized
             db_setting_id = cls.objects.filter(
@@ -63,27 +112,17 @@ class AppSetting(models.Model):
             ).first()
             
             if not db_setting_id or db_setting_id.value != settings.APP_SETTING_ID:
+                # Validate before touching the table
+                instances = cls.default_instances()
+
                 # Use transaction to ensure atomic operation
                 with transaction.atomic():
-                    # Clear existing settings
+                    # Clear existing settings and insert the defaults in one go
                     cls.objects.all().delete()
-                    
-                    # Initialize with default settings
-                    default_settings = settings.DEFAULT_APP_SETTINGS
-                    for setting, value in default_settings.items():
-                        cls.objects.create(
-                            setting=setting.lower().strip(),
-                            value=value
-                        )
-                    
-                    # Set the setting_id
-                    cls.objects.create(
-                        setting='setting_id',
-                        value=settings.APP_SETTING_ID
-                    )
+                    cls.objects.bulk_create(instances)
                 
-                # Clear cache after bulk update
-                cache.delete('app_settings')
+                    # Invalidate cached settings once the bulk update is committed
+                    transaction.on_commit(bump_settings_stamp)
                 
         except Exception as e:
             logger.error(f"Error initializing settings: {str(e)}")
@@ -91,26 +130,48 @@ class AppSetting(models.Model):
 
     @classmethod
     def load_settings(cls):
-        """Load all settings with cache"""
-        cache_key = 'app_settings'
-        settings_dict = cache.get(cache_key)
-        
-        if settings_dict is None:
-            settings_dict = {}
-            for setting in cls.objects.all():
-                try:
-                    settings_dict[setting.setting] = setting.value
-                except json.JSONDecodeError:
-                    settings_dict[setting.setting] = None
-            
-            # Cache for 1 hour
-            cache.set(cache_key, settings_dict, 3600)
-        
+        """Load all settings with cache (a copy the caller may change)"""
+        return dict(cls.cached_settings())
+
+    @classmethod
+    def cached_settings(cls):
+        """All settings as a read-only mapping shared by the process
+
+        Checked in order: this process's copy, the shared cache, the database.
+        Both caches are keyed by the settings_stamp() version, so a change made
+        by any worker is seen by every worker on its next request, and the
+        usual path costs one stat() and no query.
+        """
+        global _local_settings
+        stamp = settings_stamp()
+        local_stamp, settings_dict = _local_settings
+        if settings_dict is None or local_stamp != stamp:
+            cache_key = f'{SETTINGS_CACHE_KEY}:{stamp}'
+            settings_dict = cache.get(cache_key)
+
+            if settings_dict is None:
+                settings_dict = {}
+                for setting in cls.objects.all():
+                    try:
+                        settings_dict[setting.setting] = setting.value
+                    except json.JSONDecodeError:
+                        settings_dict[setting.setting] = None
+
+                # Cache for 1 hour
+                cache.set(cache_key, settings_dict, 3600)
+            settings_dict = MappingProxyType(settings_dict)
+            _local_settings = (stamp, settings_dict)
+
         return settings_dict
 
     def save(self, *args, **kwargs):
         """Override save to ensure clean is called"""
         self.full_clean()  # This calls clean()
         super().save(*args, **kwargs)
-        # Clear cache after saving
-        cache.delete('app_settings')
\ No newline at end of file
+        # Invalidate cached settings in every process after saving
+        transaction.on_commit(bump_settings_stamp)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(bump_settings_stamp)
+        return result
\ No newline at end of file
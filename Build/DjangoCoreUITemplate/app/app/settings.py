@@ -8,6 +8,8 @@ Django-CoreUI settings file
 """
 from pathlib import Path
 import os
+import sys
+import tempfile
 from app.utilities import is_pg_available
 from django.utils.safestring import mark_safe
 import logging
@@ -30,6 +32,7 @@ SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-4)56uhk#wf+cm6
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 DJDTToolbar = True 
+TESTING = 'test' in sys.argv  # The debug toolbar can't be used with tests
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
 
 # SECURITY SETTINGS
@@ -102,6 +105,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'app.middleware.middleware.SettingsMiddleware',
     'app.middleware.middleware.SessionToContextMiddleware',
     'app.middleware.middleware.BreadcrumbMiddleware',
     'app.middleware.middleware.MenuMiddleware',
@@ -117,11 +121,22 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'app.urls'
 
+# TEMPLATE PROFILE
+# cached  - compiled templates kept for the life of the worker; edits need a restart (default when DEBUG is off)
+# default - Django's implicit loaders, which also cache but reload edited templates when DEBUG is on (default when DEBUG is on)
+TEMPLATE_PROFILE = os.environ.get("TEMPLATE_PROFILE", "default" if DEBUG else "cached").lower()
+WARM_TEMPLATES = os.environ.get("WARM_TEMPLATES", str(TEMPLATE_PROFILE == "cached")) == "True"  # Compile templates/ when a worker starts (app/wsgi.py)
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        'APP_DIRS': TEMPLATE_PROFILE != 'cached',  # The cached profile lists its loaders explicitly
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -132,10 +147,13 @@ TEMPLATES = [
             ],                
             'libraries':{
                 'menu_tags': 'app.templatetags.menu_tags',
+                'icon_tags': 'app.templatetags.icon_tags',
             }
         },
     },
 ]
+if TEMPLATE_PROFILE == 'cached':
+    TEMPLATES[0]['OPTIONS']['loaders'] = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
 
 # Configure whitenoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -188,14 +206,58 @@ else:
     logger.info("Using SQLite as database backend.")
     DATABASES = SQLITE_CONFIG
 
-# CACHE CONFIGURATION
-CACHES = {
+# SESSION / CACHE PROFILE
+# db             - sessions in the database, per-process LocMemCache (default)
+# cached_db      - sessions read through a cache shared by all workers, written to the database
+# signed_cookies - sessions stored in a signed cookie, so no server-side session reads or writes
+SESSION_PROFILE = os.environ.get("SESSION_PROFILE", "db").lower()
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file").lower()  # cached_db only: file or memcached
+CACHE_LOCATION = os.environ.get("CACHE_LOCATION", "")  # Directory for file, e.g. unix:/tmp/memcached.sock for memcached
+
+LOCMEM_CACHE_CONFIG = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': '',
     }
 }
 
+SHARED_CACHE_CONFIGS = {
+    'file': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_LOCATION or os.path.join(BASE_DIR, 'cache'),
+        }
+    },
+    'memcached': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',  # Needs pymemcache
+            'LOCATION': CACHE_LOCATION or 'unix:/tmp/memcached.sock',
+        }
+    },
+}
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+if SESSION_PROFILE not in SESSION_ENGINES:
+    logger.warning(f"Unknown SESSION_PROFILE '{SESSION_PROFILE}'. Falling back to db sessions.")
+    SESSION_PROFILE = 'db'
+if SESSION_PROFILE == 'cached_db':
+    if CACHE_BACKEND not in SHARED_CACHE_CONFIGS:
+        logger.warning(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}'. Falling back to the file cache.")
+        CACHE_BACKEND = 'file'
+    logger.info(f"Using cached_db sessions with the {CACHE_BACKEND} cache.")
+    CACHES = SHARED_CACHE_CONFIGS[CACHE_BACKEND]
+else:
+    logger.info(f"Using {SESSION_PROFILE} sessions.")
+    CACHES = LOCMEM_CACHE_CONFIG
+APP_SETTINGS_STAMP_FILE = os.environ.get('APP_SETTINGS_STAMP_FILE', os.path.join(tempfile.gettempdir(), 'django-coreui', 'app_settings.stamp'))  # Touched when AppSetting changes; must be shared by all workers
+MENU_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('MENU_FRAGMENT_CACHE_TIMEOUT', 300))  # Seconds to keep rendered menu HTML, 0 disables
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 0))  # Seconds to keep pages from PageCacheMixin views, 0 (the default) disables
+
 # PASSWORD VALIDATION
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -256,9 +318,10 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
 
 # SESSION CONFIGURATION
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]  # Set SESSION_PROFILE above to choose
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds CONFIGURE: This is the session length in seconds.  Change this to suit your needs.
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True # Sessions will clear when browser closes
+BREADCRUMB_STORAGE = os.environ.get('BREADCRUMB_STORAGE', 'session').lower()  # 'session' or 'cookie' (signed cookie, so page views don't write the session)
 
 # AUTHENTICATION SETTINGS
 LOGIN_URL = '/login/'
@@ -328,7 +391,7 @@ if not os.path.exists(LOGS_DIR):
     os.makedirs(LOGS_DIR)
 
 # Development-specific settings
-if DJDTToolbar:
+if DJDTToolbar and not TESTING:
     INSTALLED_APPS += [
         'debug_toolbar',
     ]
@@ -0,0 +1,42 @@
+# app/templatetags/icon_tags.py
+from django import template
+from django.core.paginator import Paginator
+from django.utils.safestring import mark_safe
+
+from app.utilities.icon_catalogue import ICONS_PER_PAGE, get_icon_set, icon_tiles, search_icons
+
+register = template.Library()
+
+
+def page_url(request, number) -> str:
+    """The current query string with page set to number"""
+    params = request.GET.copy()
+    params['page'] = number
+    return f"?{params.urlencode()}"
+
+
+@register.inclusion_tag('includes/icon_catalogue.html', takes_context=True)
+def icon_catalogue(context, set_name, markup='sprite'):
+    """One page of an icon set, searched and paginated by the request's q and page
+
+    markup is 'sprite' for <svg><use> against the set's sprite file, or
+    'font' for the icon font classes (<i class="icon cil-...">).
+    """
+    request = context['request']
+    icon_set = get_icon_set(set_name)
+    query = request.GET.get('q', '').strip()
+    page = Paginator(search_icons(set_name, query), ICONS_PER_PAGE).get_page(request.GET.get('page'))
+    tiles = icon_tiles(set_name, markup)
+    return {
+        'request': request,
+        'icon_set': icon_set,
+        'query': query,
+        'page': page,
+        'page_links': [
+            (number, page_url(request, number) if isinstance(number, int) else None)
+            for number in page.paginator.get_elided_page_range(page.number)
+        ],
+        'previous_url': page_url(request, page.previous_page_number()) if page.has_previous() else None,
+        'next_url': page_url(request, page.next_page_number()) if page.has_next() else None,
+        'tiles': mark_safe(''.join(tiles[icon] for icon in page)),
+    }
@@ -1,39 +1,38 @@
 # app/templatetags/menu_tags.py
 from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
 
-register = template.Library()
+from app.utilities.menu_renderer import render_menu_html
+from app.utilities.page_cache import BREADCRUMBS_PLACEHOLDER, render_breadcrumbs_html
 
-@register.inclusion_tag('includes/sidebar_menu_item.html', takes_context=True)
-def render_sidebar_menu_item(context, item):
-    return {
-        'item': item,
-        'user': context['user']
-    }
+register = template.Library()
 
-@register.inclusion_tag('includes/header_left_menu_item.html', takes_context=True)
-def render_header_left_menu_item(context, item):
-    return {
-        'item': item,
-        'user': context['user']
-    }
+def menu_fragment_key(menu, style, user_authenticated):
+    """Cache key for a rendered menu; content_hash changes whenever the menu does"""
+    return f"menu_html:{style}:{menu.content_hash}:{int(bool(user_authenticated))}"
 
-@register.inclusion_tag('includes/header_user_menu_item.html', takes_context=True)
-def render_header_user_menu_item(context, item):
-    return {
-        'item': item,
-        'user': context['user']
-    }
+@register.simple_tag(takes_context=True)
+def render_menu(context, menu, style='sidebar'):
+    """Render all of a menu's items in one call, cached per menu content and auth state"""
+    if not menu or not menu.items:
+        return ''
+    user = context.get('user')
+    user_authenticated = bool(user and user.is_authenticated)
+    timeout = getattr(settings, 'MENU_FRAGMENT_CACHE_TIMEOUT', 300)
+    key = menu_fragment_key(menu, style, user_authenticated)
 
-@register.inclusion_tag('includes/header_right_menu_item.html', takes_context=True)
-def render_header_right_menu_item(context, item):
-    return {
-        'item': item,
-        'user': context['user']
-    }
+    html = cache.get(key) if timeout else None
+    if html is None:
+        html = render_menu_html(menu, style)
+        if timeout:
+            cache.set(key, html, timeout)
+    return mark_safe(html)
 
-@register.inclusion_tag('includes/breadcrumbs.html', takes_context=True)
+@register.simple_tag(takes_context=True)
 def render_breadcrumbs(context, breadcrumbs):
-    return {
-        'breadcrumbs': breadcrumbs,
-        'user': context['user']
-    }
+    """The breadcrumb trail, or a placeholder PageCacheMixin fills in per request"""
+    if context.get('defer_breadcrumbs'):
+        return mark_safe(BREADCRUMBS_PLACEHOLDER)
+    return mark_safe(render_breadcrumbs_html(breadcrumbs, context['user']))
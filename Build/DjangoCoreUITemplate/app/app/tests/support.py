@@ -0,0 +1,223 @@
+"""
+Test support: menu fixtures, request helpers and the pre-optimisation menu
+loader the tests and benchmark commands compare against
+"""
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Dict, List, Optional, Union
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from app.utilities.enums import AuthRequirement, MenuItemType
+
+AUTH_CYCLE = ['all', 'auth_only', 'unauth_only', 'all']
+ICON_BASE = '/static/modules/@coreui/icons/sprites/free.svg#cil-'
+
+
+def build_menu_data(item_count: int, children_per_dropdown: int = 9) -> dict:
+    """Build a nested menu dict with item_count items in total"""
+    items = []
+    remaining = item_count
+    group = 0
+    while remaining > 0:
+        child_count = min(children_per_dropdown, remaining - 1)
+        children = [
+            {
+                'id': f'item_{group}_{child}',
+                'item_type': 'link',
+                'menu_text': f'Item {group}.{child}',
+                'url': f'/group/{group}/{child}/',
+                'icon': f'{ICON_BASE}{"home" if child % 2 else "star"}',
+                'auth_requirement': AUTH_CYCLE[child % len(AUTH_CYCLE)],
+                'order': (children_per_dropdown - child) * 10,
+            }
+            for child in range(child_count)
+        ]
+        items.append({
+            'id': f'group_{group}',
+            'item_type': 'dropdown' if children else 'link',
+            'menu_text': f'Group {group}',
+            'url': f'/group/{group}/',
+            'icon': f'{ICON_BASE}folder',
+            'auth_requirement': AUTH_CYCLE[group % len(AUTH_CYCLE)],
+            'order': group * 10,
+            'items': children,
+        })
+        remaining -= child_count + 1
+        group += 1
+    return {'menu_id': 'benchmark', 'items': items}
+
+
+def store_session(session_data) -> str:
+    """Save session data with the configured engine, returning its key"""
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store.update(session_data)
+    store.save()
+    return store.session_key
+
+
+def make_request(session_key=None, path='/'):
+    """A GET request with an unloaded session store, as SessionMiddleware leaves it"""
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    return request
+
+
+def session_loaded(request) -> bool:
+    """Whether the session backend has been read for this request"""
+    return hasattr(request.session, '_session_cache')
+
+
+@dataclass
+class LegacyMenuItem:
+    """MenuItem's deserialisation as it was before the normalised fast path (verbatim)"""
+    id: str
+    item_type: Union[MenuItemType, str] = MenuItemType.LINK
+    menu_text: Optional[str] = None
+    menu_class: Optional[str] = None
+    hover_text: Optional[str] = None
+    url: Optional[str] = None
+    auth_requirement: Union[AuthRequirement, str] = AuthRequirement.ALL
+    icon: Optional[str] = None
+    icon_class: Optional[str] = None
+    alt_icon: Optional[str] = None
+    alt_icon_class: Optional[str] = None
+    alt_status: bool = False
+    secondary_text: Optional[str] = None
+    secondary_class: Optional[str] = None
+    new_window: bool = False
+    order: int = 0
+    items: List["LegacyMenuItem"] = field(default_factory=list)
+    parent_menu: Optional["LegacyMenu"] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        """Convert string values to enums if necessary"""
+        if isinstance(self.item_type, str):
+            try:
+                for enum_member in MenuItemType:
+                    if enum_member.value == self.item_type.lower():
+                        self.item_type = enum_member
+                        break
+            except ValueError:
+                self.item_type = MenuItemType.LINK
+
+        if isinstance(self.auth_requirement, str):
+            try:
+                for enum_member in AuthRequirement:
+                    if enum_member.value == self.auth_requirement.lower():
+                        self.auth_requirement = enum_member
+                        break
+            except ValueError:
+                self.auth_requirement = AuthRequirement.ALL
+
+    def set_parent_menu(self, parent_menu: "LegacyMenu"):
+        """Set parent menu and propagate to children"""
+        self.parent_menu = parent_menu
+        if self.item_type == MenuItemType.DROPDOWN:
+            for item in self.items:
+                item.set_parent_menu(parent_menu)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LegacyMenuItem":
+        """Create a MenuItem from a dictionary"""
+        data_copy = data.copy()
+        items_data = data_copy.pop("items", [])
+
+        # Ensure order is an integer
+        if "order" in data_copy:
+            data_copy["order"] = int(data_copy["order"])
+
+        if "item_type" in data_copy:
+            if isinstance(data_copy["item_type"], MenuItemType):
+                data_copy["item_type"] = data_copy["item_type"].value
+            else:
+                data_copy["item_type"] = str(data_copy["item_type"]).lower()
+
+        if "auth_requirement" in data_copy:
+            if isinstance(data_copy["auth_requirement"], AuthRequirement):
+                data_copy["auth_requirement"] = data_copy["auth_requirement"].value
+            else:
+                data_copy["auth_requirement"] = str(
+                    data_copy["auth_requirement"]
+                ).lower()
+
+        item = cls(**data_copy)
+        items_data = sorted(items_data, key=lambda x: x.get("order", 0))
+        item.items = [cls.from_dict(item_data) for item_data in items_data]
+        return item
+
+    def to_dict(self) -> Dict:
+        """Convert MenuItem to dictionary"""
+        return {
+            "id": self.id,
+            "item_type": self.item_type.value,
+            "menu_text": self.menu_text,
+            "menu_class": self.menu_class,
+            "hover_text": self.hover_text,
+            "url": self.url,
+            "auth_requirement": self.auth_requirement.value,
+            "icon": self.icon,
+            "icon_class": self.icon_class,
+            "alt_icon": self.alt_icon,
+            "alt_icon_class": self.alt_icon_class,
+            "alt_status": self.alt_status,
+            "secondary_text": self.secondary_text,
+            "secondary_class": self.secondary_class,
+            "new_window": self.new_window,
+            "order": self.order,
+            "items": [item.to_dict() for item in self.items],
+        }
+
+
+@dataclass
+class LegacyMenu:
+    """Menu's deserialisation as it was before the normalised fast path (verbatim)"""
+    menu_id: str
+    items: List[LegacyMenuItem] = field(default_factory=list)
+    _dirty: bool = field(default=False, init=False)
+    _version: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self._set_parent_references()
+        self._sort_items()
+
+    def _set_parent_references(self):
+        """Set parent menu references for all items"""
+        for item in self.items:
+            item.set_parent_menu(self)
+
+    def _sort_items(self):
+        """Sort all items by order"""
+
+        def sort_recursive(items: List[LegacyMenuItem]):
+            sorted_items = sorted(items, key=lambda x: (x.order, x.id))
+            items.clear()
+            items.extend(sorted_items)
+
+            for item in items:
+                if item.item_type == MenuItemType.DROPDOWN and item.items:
+                    sort_recursive(item.items)
+
+        sort_recursive(self.items)
+
+    def to_dict(self) -> Dict:
+        return {
+            "menu_id": self.menu_id,
+            "items": [item.to_dict() for item in self.items],
+            "version": self._version,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LegacyMenu":
+        menu_id = data.get("menu_id") or data.get("id")
+        # Sort items before creating menu
+        items_data = sorted(data.get("items", []), key=lambda x: x.get("order", 0))
+        menu = cls(
+            menu_id=menu_id, items=[LegacyMenuItem.from_dict(item) for item in items_data]
+        )
+        menu._version = data.get("version", 0)
+        menu._sort_items()  # Ensure everything is sorted
+        return menu
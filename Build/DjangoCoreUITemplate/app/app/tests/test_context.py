@@ -0,0 +1,31 @@
+"""
+Tests for the template context processors
+"""
+from django.template import engines
+from django.test import TestCase
+
+from app.tests.support import build_menu_data, make_request, session_loaded, store_session
+
+
+class SettingsContextTests(TestCase):
+    """settings_context only reads the session when a template uses it"""
+
+    def setUp(self):
+        self.session_key = store_session({'menus': {'benchmark': build_menu_data(50)}})
+
+    def test_unused_context_does_not_load_session(self):
+        template = engines['django'].from_string('<title>{{ title }}</title>')
+        request = make_request(self.session_key)
+
+        with self.assertNumQueries(0):
+            html = template.render({'title': 'Lazy'}, request)
+
+        self.assertEqual(html, '<title>Lazy</title>')
+        self.assertFalse(session_loaded(request))
+
+    def test_used_context_loads_session(self):
+        template = engines['django'].from_string('{{ SESSION_DATA|length }}')
+        request = make_request(self.session_key)
+
+        self.assertEqual(template.render({}, request), '1')
+        self.assertTrue(session_loaded(request))
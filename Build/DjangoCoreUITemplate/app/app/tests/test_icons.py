@@ -0,0 +1,29 @@
+"""
+Tests for the icon catalogue
+"""
+from django.template import engines
+from django.test import SimpleTestCase
+
+from app.tests.support import make_request
+from app.utilities.icon_catalogue import ICONS_PER_PAGE, search_icons
+
+
+class IconCatalogueTests(SimpleTestCase):
+    """The icon_catalogue tag pages a search and keeps the query in its links"""
+
+    def test_renders_second_page_of_search(self):
+        icons = search_icons('free', 'a')
+        self.assertGreater(len(icons), 2 * ICONS_PER_PAGE)  # Needs a previous and a next page
+        template = engines['django'].from_string("{% load icon_tags %}{% icon_catalogue 'free' %}")
+        request = make_request(path='/icons/?set=free&q=a&page=2')
+
+        html = template.render({}, request)
+
+        page = icons[ICONS_PER_PAGE:2 * ICONS_PER_PAGE]
+        self.assertIn(f'<div>{page[0]}</div>', html)
+        self.assertIn(f'<div>{page[-1]}</div>', html)
+        self.assertNotIn(f'<div>{icons[0]}</div>', html)
+        self.assertIn('<span class="page-link">2</span>', html)
+        self.assertIn('href="?set=free&amp;q=a&amp;page=1">Previous</a>', html)
+        self.assertIn('href="?set=free&amp;q=a&amp;page=3">Next</a>', html)
+        self.assertIn('href="?set=free&amp;q=a&amp;page=3">3</a>', html)
@@ -0,0 +1,40 @@
+"""
+Tests for the initial setup superuser check
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from app.middleware.initial_setup import SUPERUSER_EXISTS_CACHE_KEY, superuser_exists
+
+
+class SuperuserExistsTests(TestCase):
+    """The cached answer is only dropped when a superuser can have gone away"""
+
+    def setUp(self):
+        cache.delete(SUPERUSER_EXISTS_CACHE_KEY)
+        self.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.assertTrue(superuser_exists())
+
+    def test_cached_answer_needs_no_query(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(superuser_exists())
+
+    def test_ordinary_user_changes_keep_cached_answer(self):
+        user = get_user_model().objects.create_user('user', 'user@example.com', 'password')
+        user.first_name = 'Edited'
+        user.save()
+
+        self.assertTrue(cache.get(SUPERUSER_EXISTS_CACHE_KEY))
+
+    def test_demotion_resets_cached_answer(self):
+        self.admin.is_superuser = False
+        self.admin.save()
+
+        self.assertIsNone(cache.get(SUPERUSER_EXISTS_CACHE_KEY))
+        self.assertFalse(superuser_exists())
+
+    def test_deleting_superuser_resets_cached_answer(self):
+        self.admin.delete()
+
+        self.assertFalse(superuser_exists())
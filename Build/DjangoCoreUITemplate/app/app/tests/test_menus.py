@@ -0,0 +1,114 @@
+"""
+Tests for menu loading
+"""
+from unittest import mock
+
+from django.test import TestCase
+
+from app.defaults import DEFAULT_MENUS
+from app.tests.support import LegacyMenu, build_menu_data, make_request
+from app.utilities.menu_manager import (
+    Menu, MenuItem, MenuManager, apply_menu_overlay, build_menu_overlay, get_default_menus,
+)
+from app.utilities.session_manager import get_session_manager
+
+
+class MenuTestCase(TestCase):
+    def assertSameMenu(self, menu, expected):
+        self.assertEqual(menu.to_dict()['items'], expected['items'])
+
+
+class MenuLoadingTests(MenuTestCase):
+    """Menu.from_dict, Menu.from_normalized and the session path build the same menus"""
+
+    def test_from_dict_matches_legacy_loader(self):
+        # Unnormalised input: upper-case enums, string orders, unsorted items
+        data = build_menu_data(120)
+        for item in data['items']:
+            item['item_type'] = item['item_type'].upper()
+            item['order'] = str(item['order'])
+        data['items'].reverse()
+
+        self.assertSameMenu(Menu.from_dict(data), LegacyMenu.from_dict(data).to_dict())
+
+    def test_from_normalized_matches_from_dict(self):
+        payload = Menu.from_dict(build_menu_data(500)).to_dict()  # As stored in a session
+        expected = LegacyMenu.from_dict(payload).to_dict()
+
+        self.assertSameMenu(Menu.from_dict(payload), expected)
+        self.assertSameMenu(Menu.from_normalized(payload), expected)
+
+    def test_default_menus_match_legacy_loader(self):
+        for menu_id, menu_config in DEFAULT_MENUS.items():
+            with self.subTest(menu_id=menu_id):
+                self.assertSameMenu(get_default_menus()[menu_id], LegacyMenu.from_dict(menu_config).to_dict())
+
+    def test_session_path_matches_from_dict(self):
+        menu = Menu.from_dict(build_menu_data(200))
+        expected = LegacyMenu.from_dict(menu.to_dict()).to_dict()
+
+        # Stored as an overlay, as MenuManager saves it
+        request = make_request()
+        request.session.update({'menu_overlay': {menu.menu_id: build_menu_overlay(None, menu)}, 'menu_version': 1})
+        manager = MenuManager(get_session_manager(request))
+        self.assertSameMenu(manager._menus[menu.menu_id], expected)
+
+        # Stored as a full copy, as sessions written before the overlay hold it
+        request = make_request()
+        request.session.update({'menus': {menu.menu_id: menu.to_dict()}})
+        manager = MenuManager(get_session_manager(request))
+        self.assertSameMenu(manager._menus[menu.menu_id], expected)
+
+
+class MenuEditTests(MenuTestCase):
+    """Edits derive hashes and overlays from what changed, not from the whole menu"""
+
+    def setUp(self):
+        menu = Menu.from_dict(build_menu_data(500))
+        self.item_id = menu.items[-1].items[-1].id
+        self.request = make_request()
+        self.request.session.update({'menu_overlay': {menu.menu_id: build_menu_overlay(None, menu)}, 'menu_version': 1})
+        self.manager = MenuManager(get_session_manager(self.request))
+        self.manager.get_menu(menu.menu_id, True)
+
+    def assertOverlayMatches(self, menu_id):
+        """The stored overlay rebuilds the edited menu and holds what a full diff would"""
+        default = get_default_menus().get(menu_id)
+        menu = self.manager._menus[menu_id]
+        stored = self.request.session['menu_overlay'].get(menu_id, {})
+        full = build_menu_overlay(default, menu)
+
+        self.assertEqual(apply_menu_overlay(default, menu_id, stored).to_dict()['items'], menu.to_dict()['items'])
+        self.assertCountEqual(stored.get('removed', []), full.get('removed', []))
+        self.assertEqual(stored.get('changed', {}), full.get('changed', {}))
+        self.assertCountEqual(stored.get('added', []), full.get('added', []))
+
+    def test_badge_edit_does_not_serialise_menu(self):
+        before = self.manager._menus['benchmark'].content_hash
+
+        with mock.patch.object(MenuItem, 'to_dict', autospec=True, side_effect=MenuItem.to_dict) as to_dict:
+            self.manager.update_item('benchmark', self.item_id, secondary_text='3')
+            menu = self.manager.get_menu('benchmark', True)
+
+        self.assertLess(to_dict.call_count, 5)
+        self.assertNotEqual(menu.content_hash, before)
+        self.assertEqual(menu.find_item(self.item_id).secondary_text, '3')
+        self.assertOverlayMatches('benchmark')
+
+    def test_edits_to_default_menus_keep_overlay_in_step(self):
+        for menu_id, default in get_default_menus().items():
+            with self.subTest(menu_id=menu_id):
+                first, last = default.items[0], default.items[-1]
+                self.manager.update_item(menu_id, first.id, secondary_text='new', order=last.order + 10)
+                self.manager.toggle_alt_state(menu_id, first.id)
+                self.manager.remove_item(menu_id, last.id)
+                self.manager.add_item(menu_id, MenuItem(id='added', menu_text='Added', url='/added/'))
+                self.assertOverlayMatches(menu_id)
+
+                self.manager.remove_item(menu_id, 'added')
+                self.manager.add_item(menu_id, MenuItem(id=last.id, menu_text='Back', url='/back/'))
+                self.assertOverlayMatches(menu_id)
+
+                # A later request rebuilds the same menu from the session
+                reloaded = MenuManager(get_session_manager(self.request))
+                self.assertSameMenu(reloaded._menus[menu_id], self.manager._menus[menu_id].to_dict())
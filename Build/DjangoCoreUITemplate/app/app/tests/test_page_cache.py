@@ -0,0 +1,85 @@
+"""
+Tests for page validation and the page cache
+"""
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from app.utilities.page_cache import BREADCRUMBS_PLACEHOLDER
+from app.utilities.session_manager import SETTINGS_OVERLAY_KEY
+
+
+class ConditionalPageTests(TestCase):
+    """Chrome pages answer a matching If-None-Match with a 304"""
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get('/icons/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/icons/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Cookie', response['Vary'])
+        self.assertNotIn('Last-Modified', response)
+
+    @override_settings(DEBUG=True)
+    def test_debug_pages_are_not_validated(self):
+        with mock.patch('app.utilities.page_cache.os.walk') as walk:
+            response = self.client.get('/icons/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        walk.assert_not_called()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(TestCase):
+    """Anonymous visitors share cached pages but keep their own breadcrumbs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+
+    def breadcrumbs(self, response):
+        html = response.content.decode()
+        return html[html.index('<ol class="breadcrumb'):html.index('</ol>')]
+
+    def test_visitors_share_page_with_own_breadcrumbs(self):
+        first, second = Client(), Client()
+        first.get('/examples/')
+        second.get('/')
+
+        miss = first.get('/icons/')
+        hit = second.get('/icons/')
+
+        self.assertEqual(miss['X-Page-Cache'], 'miss')
+        self.assertEqual(hit['X-Page-Cache'], 'hit')
+        self.assertIn('/examples/', self.breadcrumbs(miss))
+        self.assertNotIn('/examples/', self.breadcrumbs(hit))
+        self.assertNotIn(BREADCRUMBS_PLACEHOLDER, miss.content.decode())
+        self.assertNotIn(BREADCRUMBS_PLACEHOLDER, hit.content.decode())
+        self.assertEqual(miss.content.replace(self.breadcrumbs(miss).encode(), b''),
+                         hit.content.replace(self.breadcrumbs(hit).encode(), b''))
+
+    def test_setting_overrides_skip_cache(self):
+        self.client.get('/icons/')
+        session = self.client.session
+        session[SETTINGS_OVERLAY_KEY] = {'appname': 'Mine', 'settings_version': settings.APP_SETTING_ID}
+        session.save()
+
+        response = self.client.get('/icons/')
+
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'Mine')
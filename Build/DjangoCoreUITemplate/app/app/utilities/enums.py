@@ -1,21 +1,27 @@
 # app/enums.py
 from enum import Enum, auto
 
-class AuthRequirement(Enum):
-    """Authentication requirements"""
+class AuthRequirement(str, Enum):
+    """Authentication requirements (compares equal to its string value in templates)"""
     AUTH_ONLY = "auth_only"      # Only show when authenticated
     UNAUTH_ONLY = "unauth_only"  # Only show when not authenticated
     ALL = "all"                  # Show for all users
 
-class MenuPosition(Enum):
+    def is_visible(self, user_authenticated: bool) -> bool:
+        """Check if an item with this requirement is shown to the user"""
+        if self is AuthRequirement.ALL:
+            return True
+        return (self is AuthRequirement.AUTH_ONLY) == bool(user_authenticated)
+
+class MenuPosition(str, Enum):
     """Menu item positions"""
     TOP = "top"
     BOTTOM = "bottom"
     BEFORE = "before"
     AFTER = "after"
 
-class MenuItemType(Enum):
-    """Menu item types"""
+class MenuItemType(str, Enum):
+    """Menu item types (compares equal to its string value in templates)"""
     HEADER = "header"
     LINK = "link"
     SEPARATOR = "separator"
@@ -0,0 +1,130 @@
+# app/utilities/example_templates.py
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExampleTemplate(NamedTuple):
+    """One template under templates/examples"""
+    path: str  # Relative path without .html, as used in /examples/<path>/
+    name: str
+    url: str
+    file: str
+    mtime: int
+    source: Optional[str]
+
+
+class ExampleTemplateIndex:
+    """Process-wide index of the example templates and their source.
+
+    Built on first use with a single walk of templates/examples.  With DEBUG
+    on, each lookup checks directory and file mtimes so added, removed and
+    edited templates show up without a restart; with DEBUG off the index is
+    never checked again and example pages do no filesystem access.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = root
+        self._lock = threading.Lock()
+        self._templates: Optional[Dict[str, ExampleTemplate]] = None
+        self._listing: List[dict] = []
+        self._dir_mtimes: Dict[str, int] = {}
+
+    @property
+    def root(self) -> Path:
+        return self._root or Path(settings.BASE_DIR) / 'templates' / 'examples'
+
+    def build(self):
+        """Walk the examples directory and read every template"""
+        templates = {}
+        dir_mtimes = {}
+        root = self.root
+        for directory, dirs, files in os.walk(root):
+            dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            for file in files:
+                if not file.endswith('.html'):
+                    continue
+                full_path = os.path.join(directory, file)
+                template_path = os.path.splitext(os.path.relpath(full_path, root))[0].replace(os.sep, '/')
+                templates[template_path] = self._load(template_path, full_path)
+
+        listing = [
+            {'path': template.path, 'name': template.name, 'url': template.url}
+            for path, template in sorted(templates.items())
+            if path != 'index'  # Skip index.html
+        ]
+        with self._lock:
+            self._templates = templates
+            self._listing = listing
+            self._dir_mtimes = dir_mtimes
+
+    def _load(self, template_path, full_path) -> ExampleTemplate:
+        try:
+            mtime = os.stat(full_path).st_mtime_ns
+            with open(full_path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Error reading example template {full_path}: {e}")
+            mtime, source = 0, None
+        return ExampleTemplate(
+            path=template_path,
+            name=template_path.replace('/', ' > ').title(),
+            url=f"/examples/{template_path}/",
+            file=full_path,
+            mtime=mtime,
+            source=source,
+        )
+
+    def _ensure_current(self):
+        """Build on first use; in DEBUG, rebuild when a directory has changed"""
+        if self._templates is None:
+            self.build()
+        elif settings.DEBUG and self._directories_changed():
+            self.build()
+
+    def _directories_changed(self) -> bool:
+        # Adding, removing or renaming a file changes its directory's mtime
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def get(self, template_path) -> Optional[ExampleTemplate]:
+        """The indexed template for a path, or None if there isn't one"""
+        self._ensure_current()
+        template = self._templates.get(template_path)
+        if template is not None and settings.DEBUG:
+            # Pick up edits to the file itself
+            try:
+                changed = os.stat(template.file).st_mtime_ns != template.mtime
+            except FileNotFoundError:
+                changed = True
+            if changed:
+                template = self._load(template_path, template.file)
+                with self._lock:
+                    self._templates[template_path] = template
+        return template
+
+    def exists(self, template_path) -> bool:
+        return self.get(template_path) is not None
+
+    def source(self, template_path) -> Optional[str]:
+        template = self.get(template_path)
+        return template.source if template else None
+
+    def listing(self) -> List[dict]:
+        """Sorted path/name/url entries for every example except the index"""
+        self._ensure_current()
+        return self._listing
+
+
+example_templates = ExampleTemplateIndex()
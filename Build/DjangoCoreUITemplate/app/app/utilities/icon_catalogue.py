@@ -0,0 +1,83 @@
+# app/utilities/icon_catalogue.py
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+logger = logging.getLogger(__name__)
+
+SPRITE_DIR = 'modules/@coreui/icons/sprites'
+ICON_SETS = {  # Set name -> title, in display order
+    'free': 'Free',
+    'brand': 'Brand',
+    'flag': 'Flag',
+}
+ICONS_PER_PAGE = 96  # 16 rows of the 6 column grid
+ICON_TILES = {  # Markup style -> HTML for one grid cell
+    'sprite': (
+        '<div class="lh-lg m-2 col-6 col-sm-4 col-md-2"><svg class="icon icon-lg">'
+        '<use xlink:href="{sprite_url}#{icon}"></use></svg>\n  <div>{icon}</div>\n</div>\n'
+    ),
+    'font': (
+        '<div class="col-6 col-sm-4 col-md-2"><i class="icon icon-xxl mt-5 mb-2 {icon}"></i>\n'
+        '  <div>{icon}</div>\n</div>\n'
+    ),
+}
+SYMBOL_ID = re.compile(rb'<symbol\b[^>]*?\sid="([^"]+)"')
+
+
+class IconSet(NamedTuple):
+    name: str
+    title: str
+    sprite_url: str
+    icons: Tuple[str, ...]  # Symbol ids in sprite order
+
+
+def parse_sprite_ids(path) -> Tuple[str, ...]:
+    """The symbol ids in a sprite file, without building an XML tree"""
+    with open(path, 'rb') as f:
+        return tuple(match.group(1).decode() for match in SYMBOL_ID.finditer(f.read()))
+
+
+@lru_cache(maxsize=None)
+def get_icon_set(name) -> IconSet:
+    """Parse a sprite once per process (an empty set if it can't be found)"""
+    if name not in ICON_SETS:
+        raise KeyError(f"Unknown icon set '{name}'")
+    sprite = f"{SPRITE_DIR}/{name}.svg"
+    path = finders.find(sprite)
+    icons = ()
+    if path:
+        try:
+            icons = parse_sprite_ids(path)
+        except OSError as e:
+            logger.error(f"Error reading icon sprite {path}: {e}")
+    else:
+        logger.error(f"Icon sprite {sprite} not found")
+    return IconSet(name, ICON_SETS[name], static(sprite), icons)
+
+
+def icon_sets() -> Dict[str, IconSet]:
+    return {name: get_icon_set(name) for name in ICON_SETS}
+
+
+@lru_cache(maxsize=256)
+def search_icons(name, query='') -> Tuple[str, ...]:
+    """Icons in a set whose id contains every word of the query"""
+    icons = get_icon_set(name).icons
+    words = query.lower().split()
+    if not words:
+        return icons
+    return tuple(icon for icon in icons if all(word in icon for word in words))
+
+
+@lru_cache(maxsize=None)
+def icon_tiles(name, markup='sprite') -> Dict[str, str]:
+    """Escaped grid cell HTML for every icon in a set, rendered once per process"""
+    icon_set = get_icon_set(name)
+    tile = ICON_TILES[markup]
+    return {icon: format_html(tile, sprite_url=icon_set.sprite_url, icon=icon) for icon in icon_set.icons}
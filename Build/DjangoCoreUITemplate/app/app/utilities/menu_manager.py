@@ -1,19 +1,46 @@
 # menu_manager.py
 import hashlib
+import json
+from bisect import bisect_left, insort
 import logging
 import re
-from dataclasses import dataclass, field
-from functools import lru_cache
-from typing import Dict, List, Optional, Union
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from app.utilities.enums import AuthRequirement, MenuItemType, MenuPosition
-from .session_manager import UserSessionManager
+from .session_manager import UserSessionManager, get_session_manager
 
 logger = logging.getLogger(__name__)
 
+# Fields whose values repeat across items and sessions (icon sprite URLs, CSS
+# classes); interning them keeps one copy per process instead of one per item.
+INTERNED_FIELDS = (
+    "icon",
+    "icon_class",
+    "alt_icon",
+    "alt_icon_class",
+    "menu_class",
+    "secondary_class",
+)
 
-@dataclass
+# Enum lookups by stored value, used instead of scanning the enum members
+ITEM_TYPES = {member.value: member for member in MenuItemType}
+AUTH_REQUIREMENTS = {member.value: member for member in AuthRequirement}
+
+# Display order of items within one level
+_item_sort_key = attrgetter("order", "id")
+
+# Fields that decide whether and where an item appears in a projection
+_LAYOUT_FIELDS = frozenset({"item_type", "auth_requirement", "order"})
+
+
+@dataclass(slots=True)
 class MenuItem:
     id: str
     item_type: Union[MenuItemType, str] = MenuItemType.LINK
@@ -32,27 +59,27 @@ class MenuItem:
     new_window: bool = False
     order: int = 0
     items: List["MenuItem"] = field(default_factory=list)
-    parent_menu: Optional["Menu"] = field(default=None, repr=False)
+    parent_menu: Optional["Menu"] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
-        """Convert string values to enums if necessary"""
-        if isinstance(self.item_type, str):
-            try:
-                for enum_member in MenuItemType:
-                    if enum_member.value == self.item_type.lower():
-                        self.item_type = enum_member
-                        break
-            except ValueError:
-                self.item_type = MenuItemType.LINK
-
-        if isinstance(self.auth_requirement, str):
-            try:
-                for enum_member in AuthRequirement:
-                    if enum_member.value == self.auth_requirement.lower():
-                        self.auth_requirement = enum_member
-                        break
-            except ValueError:
-                self.auth_requirement = AuthRequirement.ALL
+        self._normalize()
+
+    def _normalize(self):
+        """Convert string values to enums if necessary and intern shared strings"""
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+
+        if not isinstance(self.item_type, MenuItemType):
+            self.item_type = ITEM_TYPES.get(
+                str(self.item_type).lower(), MenuItemType.LINK
+            )
+
+        if not isinstance(self.auth_requirement, AuthRequirement):
+            self.auth_requirement = AUTH_REQUIREMENTS.get(
+                str(self.auth_requirement).lower(), AuthRequirement.ALL
+            )
 
     def set_parent_menu(self, parent_menu: "Menu"):
         """Set parent menu and propagate to children"""
@@ -68,32 +95,58 @@ class MenuItem:
 
     @classmethod
     def from_dict(cls, data: Dict) -> "MenuItem":
-        """Create a MenuItem from a dictionary"""
+        """Create a MenuItem from a dictionary, normalising its values"""
+        return cls.from_normalized(cls.normalize_dict(data), sort=True)
+
+    @staticmethod
+    def normalize_dict(data: Dict) -> Dict:
+        """Copy an item dict with integer order and lowercase enum values, recursively"""
         data_copy = data.copy()
-        items_data = data_copy.pop("items", [])
 
         # Ensure order is an integer
         if "order" in data_copy:
             data_copy["order"] = int(data_copy["order"])
 
-        if "item_type" in data_copy:
-            if isinstance(data_copy["item_type"], MenuItemType):
-                data_copy["item_type"] = data_copy["item_type"].value
-            else:
-                data_copy["item_type"] = str(data_copy["item_type"]).lower()
+        for key in ("item_type", "auth_requirement"):
+            if key in data_copy:
+                data_copy[key] = str(getattr(data_copy[key], "value", data_copy[key])).lower()
 
-        if "auth_requirement" in data_copy:
-            if isinstance(data_copy["auth_requirement"], AuthRequirement):
-                data_copy["auth_requirement"] = data_copy["auth_requirement"].value
-            else:
-                data_copy["auth_requirement"] = str(
-                    data_copy["auth_requirement"]
-                ).lower()
+        data_copy["items"] = [
+            MenuItem.normalize_dict(item_data) for item_data in data_copy.get("items", [])
+        ]
+        return data_copy
 
-        item = cls(**data_copy)
-        items_data = sorted(items_data, key=lambda x: x.get("order", 0))
-        item.items = [cls.from_dict(item_data) for item_data in items_data]
-        return item
+    @classmethod
+    def from_normalized(cls, data: Dict, sort: bool = False) -> "MenuItem":
+        """Create a MenuItem from a dict produced by to_dict (e.g. a session payload).
+
+        Trusts that values are already normalised and, unless sort is set,
+        that children are already in display order.
+        """
+        items = [cls.from_normalized(item_data, sort) for item_data in data.get("items", ())]
+        if sort:
+            items.sort(key=_item_sort_key)
+        return cls(
+            id=data["id"],
+            item_type=ITEM_TYPES.get(data.get("item_type"), MenuItemType.LINK),
+            menu_text=data.get("menu_text"),
+            menu_class=data.get("menu_class"),
+            hover_text=data.get("hover_text"),
+            url=data.get("url"),
+            auth_requirement=AUTH_REQUIREMENTS.get(
+                data.get("auth_requirement"), AuthRequirement.ALL
+            ),
+            icon=data.get("icon"),
+            icon_class=data.get("icon_class"),
+            alt_icon=data.get("alt_icon"),
+            alt_icon_class=data.get("alt_icon_class"),
+            alt_status=data.get("alt_status", False),
+            secondary_text=data.get("secondary_text"),
+            secondary_class=data.get("secondary_class"),
+            new_window=data.get("new_window", False),
+            order=data.get("order", 0),
+            items=items,
+        )
 
     def to_dict(self) -> Dict:
         """Convert MenuItem to dictionary"""
@@ -142,10 +195,11 @@ class MenuItem:
         if position is not None:
             self.items.insert(position, item)
         else:
-            # If no position specified, add to end and sort by order
-            self.items.append(item)
-            self.items.sort(key=lambda x: x.order)
+            # If no position specified, insert in order
+            insort(self.items, item, key=_item_sort_key)
 
+        if self.parent_menu:
+            self.parent_menu._forget_index()
         self.mark_parent_dirty()
 
     def remove_item(self, item_id: str) -> bool:
@@ -156,16 +210,35 @@ class MenuItem:
         initial_length = len(self.items)
         self.items = [item for item in self.items if item.id != item_id]
         if len(self.items) < initial_length:
+            if self.parent_menu:
+                self.parent_menu._forget_index()
             self.mark_parent_dirty()
         return len(self.items) < initial_length
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     menu_id: str
     items: List[MenuItem] = field(default_factory=list)
     _dirty: bool = field(default=False, init=False)
     _version: int = field(default=0, init=False)
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False)
+    _projections: Dict[bool, "Menu"] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    # id -> item and id -> parent dropdown (None at the top level), built on
+    # first lookup and kept up to date by add_item/remove_item/update_item
+    _index: Optional[Dict[str, MenuItem]] = field(
+        default=None, init=False, repr=False
+    )
+    _parents: Optional[Dict[str, Optional[MenuItem]]] = field(
+        default=None, init=False, repr=False
+    )
+    # Ids of the items add_item/remove_item/update_item changed since the last
+    # mark_clean, in the order they changed; None after any other change
+    _touched: Optional[Dict[str, None]] = field(
+        default_factory=dict, init=False, repr=False
+    )
 
     def __post_init__(self):
         self._set_parent_references()
@@ -210,19 +283,204 @@ class Menu:
     def is_dirty(self):
         return self._dirty
 
+    @property
+    def content_hash(self) -> str:
+        """Hash of the menu's id and items, computed once per change"""
+        if self._content_hash is None:
+            payload = json.dumps(
+                [self.menu_id, [item.to_dict() for item in self.items]],
+                sort_keys=True,
+            )
+            self._content_hash = hashlib.md5(payload.encode()).hexdigest()
+        return self._content_hash
+
     def mark_dirty(self):
         self._dirty = True
         self._version += 1
+        self._content_hash = None
+        self._projections = {}
+        self._touched = None
+
+    def _mark_items_changed(self, item_ids: Iterable[str], *change):
+        """mark_dirty after a change to known items, deriving the new content
+        hash from the old one and a description of the change"""
+        content_hash = self._content_hash
+        touched = self._touched
+        self.mark_dirty()
+        if content_hash is not None:
+            self._content_hash = _derived_hash(content_hash, *change)
+        if touched is not None:
+            touched.update(dict.fromkeys(item_ids))
+            self._touched = touched
+
+    def touched_items(self) -> Optional[List[str]]:
+        """Ids of the items changed since the last mark_clean, or None if unknown"""
+        return None if self._touched is None else list(self._touched)
+
+    def visible_to(self, user_authenticated: bool) -> "Menu":
+        """Get the read-only projection of this menu for an auth state.
+
+        Projections are built on first use and kept until the next
+        mark_dirty, so serving a menu is a dictionary lookup.
+        """
+        user_authenticated = bool(user_authenticated)
+        projection = self._projections.get(user_authenticated)
+        if projection is None:
+            projection = self._build_projection(user_authenticated)
+            self._projections[user_authenticated] = projection
+        return projection
+
+    def _build_projection(
+        self, user_authenticated: bool, items: Optional[List[MenuItem]] = None
+    ) -> "Menu":
+        """Build a menu with only the items visible for an auth state
+
+        Pass the items of an existing projection to reuse them after a change
+        that can't affect which items are visible.
+        """
+
+        def project(items: List[MenuItem]) -> List[MenuItem]:
+            visible = []
+            for item in items:  # Already sorted, so order is preserved
+                if not item.auth_requirement.is_visible(user_authenticated):
+                    continue
+                if item.item_type == MenuItemType.DROPDOWN:
+                    children = project(item.items)
+                    # Hide dropdowns with nothing visible inside them
+                    if children:
+                        visible.append(replace(item, items=children))
+                else:
+                    visible.append(item)
+            return visible
+
+        # Assign items after construction so shared items keep their parent menu
+        projection = Menu(menu_id=self.menu_id)
+        projection.items = project(self.items) if items is None else items
+        # Determined by this menu's content and the auth state
+        projection._content_hash = _derived_hash(self.content_hash, user_authenticated)
+        return projection
 
     def mark_clean(self):
         self._dirty = False
+        self._touched = {}
+
+    def _build_index(self):
+        """Index every item by id, along with its parent dropdown"""
+        index = {}
+        parents = {}
+
+        def walk(items: List[MenuItem], parent: Optional[MenuItem]):
+            for item in items:
+                index[item.id] = item
+                parents[item.id] = parent
+                walk(item.items, item)
+
+        walk(self.items, None)
+        self._index = index
+        self._parents = parents
+
+    def _forget_index(self):
+        """Drop the index after items were changed outside the Menu methods"""
+        self._index = None
+        self._parents = None
+
+    def _detach(self, item: MenuItem) -> List[MenuItem]:
+        """Take an indexed item out of its sibling list, returning that list"""
+        parent = self._parents[item.id]
+        siblings = parent.items if parent else self.items
+        position = bisect_left(siblings, _item_sort_key(item), key=_item_sort_key)
+        if position >= len(siblings) or siblings[position] is not item:
+            # Lists built with an explicit position may be out of order
+            position = next(i for i, sibling in enumerate(siblings) if sibling is item)
+        del siblings[position]
+        return siblings
+
+    def find_item(self, item_id: str) -> Optional[MenuItem]:
+        """Find an item at any depth by id"""
+        if self._index is None:
+            self._build_index()
+        return self._index.get(item_id)
+
+    def find_parent(self, item_id: str) -> Optional[MenuItem]:
+        """Find the dropdown holding an item (None for top-level items)"""
+        if self._index is None:
+            self._build_index()
+        return self._parents.get(item_id)
+
+    def add_item(self, item: MenuItem, parent_id: Optional[str] = None):
+        """Add an item (to a dropdown when parent_id is given) in display order"""
+        parent = None
+        if parent_id is not None:
+            parent = self.find_item(parent_id)
+            if not parent or parent.item_type != MenuItemType.DROPDOWN:
+                raise ValueError(f"'{parent_id}' is not a dropdown in menu '{self.menu_id}'")
+        elif self._index is None:
+            self._build_index()
+        if item.id in self._index:
+            raise ValueError(f"Item '{item.id}' already exists in menu '{self.menu_id}'")
 
-    def add_item(self, item: MenuItem):
-        """Add an item and set its parent reference"""
         item.set_parent_menu(self)
-        self.items.append(item)
-        self._sort_items()
-        self.mark_dirty()
+        insort(parent.items if parent else self.items, item, key=_item_sort_key)
+        self._index_subtree(item, parent)
+        self._mark_items_changed(_subtree_ids(item), "add", parent_id, item.to_dict())
+
+    def _index_subtree(self, item: MenuItem, parent: Optional[MenuItem]):
+        """Add an item and its children to the index"""
+        self._index[item.id] = item
+        self._parents[item.id] = parent
+        for child in item.items:
+            self._index_subtree(child, item)
+
+    def remove_item(self, item_id: str) -> Optional[MenuItem]:
+        """Remove an item (and its children) at any depth"""
+        item = self.find_item(item_id)
+        if item is None:
+            return None
+        self._detach(item)
+
+        def unindex(removed: MenuItem):
+            self._index.pop(removed.id, None)
+            self._parents.pop(removed.id, None)
+            for child in removed.items:
+                unindex(child)
+
+        unindex(item)
+        self._mark_items_changed(_subtree_ids(item), "remove", item_id)
+        return item
+
+    def update_item(self, item_id: str, **changes) -> Optional[MenuItem]:
+        """Change an item's fields in place, keeping it in display order"""
+        item = self.find_item(item_id)
+        if item is None:
+            return None
+        for name in changes:
+            if name in ("id", "items", "parent_menu") or not hasattr(item, name):
+                raise ValueError(f"Cannot update menu item field '{name}'")
+
+        reposition = "order" in changes and changes["order"] != item.order
+        # Projections share non-dropdown items, so they already show other changes
+        projections = (
+            {}
+            if item.item_type == MenuItemType.DROPDOWN or changes.keys() & _LAYOUT_FIELDS
+            else self._projections
+        )
+        if reposition:
+            siblings = self._detach(item)
+        for name, value in changes.items():
+            setattr(item, name, value)
+        item._normalize()
+        if reposition:
+            insort(siblings, item, key=_item_sort_key)
+        fields = item.to_dict()
+        self._mark_items_changed(
+            [item_id], "update", item_id, {name: fields[name] for name in changes}
+        )
+        if self._content_hash is not None:
+            self._projections = {
+                user_authenticated: self._build_projection(user_authenticated, projection.items)
+                for user_authenticated, projection in projections.items()
+            }
+        return item
 
     def to_dict(self) -> Dict:
         return {
@@ -233,116 +491,482 @@ class Menu:
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Menu":
-        menu_id = data.get("menu_id") or data.get("id")
-        # Sort items before creating menu
-        items_data = sorted(data.get("items", []), key=lambda x: x.get("order", 0))
-        menu = cls(
-            menu_id=menu_id, items=[MenuItem.from_dict(item) for item in items_data]
+        """Create a Menu from a dictionary, normalising and sorting its items"""
+        data_copy = dict(
+            data,
+            items=[MenuItem.normalize_dict(item) for item in data.get("items", [])],
         )
+        return cls.from_normalized(data_copy, sort=True)
+
+    @classmethod
+    def from_normalized(cls, data: Dict, sort: bool = False) -> "Menu":
+        """Create a Menu from a dict produced by to_dict, sorting each level at most once"""
+        menu = cls(menu_id=data.get("menu_id") or data.get("id"))
+        items = [MenuItem.from_normalized(item, sort) for item in data.get("items", ())]
+        if sort:
+            items.sort(key=_item_sort_key)
+        menu.items = items
+        menu._set_parent_references()
         menu._version = data.get("version", 0)
-        menu._sort_items()  # Ensure everything is sorted
         return menu
 
 
+# Process-wide compiled default menus, built once from DEFAULT_MENUS and shared
+# by every session.  Treat these Menu objects as read-only: MenuManager copies a
+# menu before its first modification and stores only the difference (the
+# "overlay") in the user's session.
+_default_menus: Optional[Mapping[str, Menu]] = None
+_default_menus_lock = threading.Lock()
+
+
+def get_default_menus() -> Mapping[str, Menu]:
+    """Get the shared, compiled default menus (built once per process)"""
+    global _default_menus
+    if _default_menus is None:
+        with _default_menus_lock:
+            if _default_menus is None:
+                from app.defaults import DEFAULT_MENUS
+
+                logger.info("Compiling default menus")
+                compiled = {}
+                for menu_id, menu_config in DEFAULT_MENUS.items():
+                    menu = Menu.from_dict(menu_config)
+                    menu.mark_clean()
+                    compiled[menu_id] = menu
+                _default_menus = MappingProxyType(compiled)
+    return _default_menus
+
+
+def reset_default_menus():
+    """Drop the compiled default menus so they are rebuilt on next access"""
+    global _default_menus
+    with _default_menus_lock:
+        _default_menus = None
+
+
+def _walk_items(
+    items: List[Dict], parent_id: Optional[str] = None
+) -> Iterator[Tuple[Dict, Optional[str], List[Dict]]]:
+    """Yield (item, parent_id, containing list) for a tree of item dicts, pre-order"""
+    for item in items:
+        yield item, parent_id, items
+        yield from _walk_items(item.get("items", []), item["id"])
+
+
+def _subtree_ids(item: MenuItem) -> Iterator[str]:
+    """Yield the ids of an item and its descendants, pre-order"""
+    yield item.id
+    for child in item.items:
+        yield from _subtree_ids(child)
+
+
+def _item_fields(item: Dict) -> Dict:
+    """Get the item's own fields, without its children"""
+    return {key: value for key, value in item.items() if key != "items"}
+
+
+# Values MenuItem.from_normalized assumes for missing keys; added items are
+# stored without them to keep the session payload small
+_ITEM_FIELD_DEFAULTS = {
+    "item_type": MenuItemType.LINK.value,
+    "auth_requirement": AuthRequirement.ALL.value,
+    "alt_status": False,
+    "new_window": False,
+    "order": 0,
+    "parent": None,
+}
+
+
+def _compact_fields(fields: Dict) -> Dict:
+    """Drop fields that hold their default value"""
+    return {
+        key: value
+        for key, value in fields.items()
+        if value != _ITEM_FIELD_DEFAULTS.get(key) or key == "id"
+    }
+
+
+def build_menu_overlay(base: Optional[Menu], menu: Menu) -> Dict:
+    """Describe how a menu differs from its default as a compact overlay dict.
+
+    The overlay has up to three keys: ``removed`` (item ids), ``changed``
+    (item id -> changed fields, including ``parent`` when an item moved) and
+    ``added`` (field dicts with a ``parent`` key, in tree order).
+    """
+    base_items = {
+        item["id"]: (parent_id, _item_fields(item))
+        for item, parent_id, _ in _walk_items(base.to_dict()["items"] if base else [])
+    }
+    overlay = {}
+    added = []
+    changed = {}
+    seen = set()
+
+    for item, parent_id, _ in _walk_items(menu.to_dict()["items"]):
+        seen.add(item["id"])
+        fields = _item_fields(item)
+        if item["id"] not in base_items:
+            added.append(_compact_fields(dict(fields, parent=parent_id)))
+            continue
+
+        base_parent_id, base_fields = base_items[item["id"]]
+        diff = {
+            key: value for key, value in fields.items() if base_fields.get(key) != value
+        }
+        if parent_id != base_parent_id:
+            diff["parent"] = parent_id
+        if diff:
+            changed[item["id"]] = diff
+
+    removed = [item_id for item_id in base_items if item_id not in seen]
+    if removed:
+        overlay["removed"] = removed
+    if changed:
+        overlay["changed"] = changed
+    if added:
+        overlay["added"] = added
+    return overlay
+
+
+def update_menu_overlay(
+    base: Optional[Menu], menu: Menu, overlay: Dict, item_ids: Iterable[str]
+) -> Dict:
+    """Bring an overlay from build_menu_overlay up to date after changes to some items.
+
+    Only the given items are compared with the default, so a small edit
+    doesn't serialise both whole menus.  ``added`` keeps the order items were
+    added in, which still puts every dropdown before its children.
+    """
+    removed = list(overlay.get("removed", []))
+    changed = dict(overlay.get("changed", {}))
+    added = {fields["id"]: fields for fields in overlay.get("added", [])}
+
+    for item_id in item_ids:
+        item = menu.find_item(item_id)
+        base_item = base.find_item(item_id) if base else None
+        if item is None:
+            changed.pop(item_id, None)
+            added.pop(item_id, None)
+            if base_item is not None and item_id not in removed:
+                removed.append(item_id)
+            continue
+
+        parent = menu.find_parent(item_id)
+        parent_id = parent.id if parent else None
+        fields = _item_fields(item.to_dict())
+        if base_item is None:
+            added[item_id] = _compact_fields(dict(fields, parent=parent_id))
+            continue
+
+        if item_id in removed:  # Removed, then added again with the same id
+            removed.remove(item_id)
+        base_parent = base.find_parent(item_id)
+        base_fields = _item_fields(base_item.to_dict())
+        diff = {
+            key: value for key, value in fields.items() if base_fields.get(key) != value
+        }
+        if parent_id != (base_parent.id if base_parent else None):
+            diff["parent"] = parent_id
+        if diff:
+            changed[item_id] = diff
+        else:
+            changed.pop(item_id, None)
+
+    overlay = {}
+    if removed:
+        overlay["removed"] = removed
+    if changed:
+        overlay["changed"] = changed
+    if added:
+        overlay["added"] = list(added.values())
+    return overlay
+
+
+def _derived_hash(*parts) -> str:
+    """Content hash for a menu fully determined by other, already hashed, inputs"""
+    return hashlib.md5(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def apply_menu_overlay(base: Optional[Menu], menu_id: str, overlay: Dict) -> Menu:
+    """Build a private Menu from a default menu (or nothing) plus an overlay"""
+    data = base.to_dict() if base else {"menu_id": menu_id, "items": []}
+    index = {
+        item["id"]: (item, siblings) for item, _, siblings in _walk_items(data["items"])
+    }
+
+    def attach(item: Dict, parent_id: Optional[str]):
+        parent = index.get(parent_id, (None, None))[0] if parent_id else None
+        siblings = parent.setdefault("items", []) if parent else data["items"]
+        siblings.append(item)
+        index[item["id"]] = (item, siblings)
+
+    for item_id in overlay.get("removed", []):
+        if item_id in index:
+            item, siblings = index.pop(item_id)
+            siblings.remove(item)
+
+    for item_id, changes in overlay.get("changed", {}).items():
+        if item_id not in index:
+            continue
+        item, siblings = index[item_id]
+        changes = dict(changes)
+        moved = "parent" in changes
+        parent_id = changes.pop("parent", None)
+        item.update(changes)
+        if moved:
+            siblings.remove(item)
+            attach(item, parent_id)
+
+    for fields in overlay.get("added", []):
+        fields = dict(fields)
+        parent_id = fields.pop("parent", None)
+        attach(dict(fields, items=[]), parent_id)
+
+    # Overlay values come from to_dict, but added or moved items need sorting
+    menu = Menu.from_normalized(data, sort=True)
+    # The default's hash plus the small overlay identify the content, so the
+    # per-request rebuild never serialises the whole menu to get its hash
+    menu._content_hash = _derived_hash(base.content_hash if base else menu_id, overlay)
+    return menu
+
+
+class FilteredMenuCache:
+    """Process-wide LRU cache of auth-filtered menus.
+
+    Entries are keyed by (menu content hash, user_authenticated), so sessions
+    that share menu content share cached results.  Cached menus are shared
+    between requests and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bool], Menu]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str, user_authenticated: bool) -> Optional[Menu]:
+        """Get a cached filtered menu, marking it most recently used"""
+        key = (content_hash, user_authenticated)
+        with self._lock:
+            menu = self._entries.get(key)
+            if menu is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return menu
+
+    def set(self, content_hash: str, user_authenticated: bool, menu: Menu):
+        """Store a filtered menu, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[(content_hash, user_authenticated)] = menu
+            self._entries.move_to_end((content_hash, user_authenticated))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, content_hash: str):
+        """Drop both auth variants of a menu"""
+        with self._lock:
+            self._entries.pop((content_hash, True), None)
+            self._entries.pop((content_hash, False), None)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and hit/miss counters"""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+filtered_menu_cache = FilteredMenuCache()
+
+
 class MenuManager:
+    """Per-request view of a user's menus.
+
+    Menus without per-user changes are served straight from the shared
+    compiled defaults; the session only carries ``menu_overlay`` (menu id ->
+    overlay dict, see ``build_menu_overlay``) and ``menu_version``.
+    """
+
     def __init__(self, session_manager: UserSessionManager):
         self.session = session_manager
         self._menus: Dict[str, Menu] = {}
-        self._cache = {}
+        self._served_hashes: Dict[str, str] = {}
         self._version = 0
-        self._load_menus()
-
-    def _load_menus(self):
-        """Load menus from session only if version has changed"""
-        stored_version = self.session.get("menu_version", 0)
-
-        if stored_version != self._version:
+        self._load_menus(force=True)
+
+    def _stored(self, key: str, default=None):
+        """Read a raw value from the underlying session"""
+        if self.session.is_using_defaults():
+            return default
+        return self.session.session.get(key, default)
+
+    def _store(self, key: str, value):
+        """Write a raw value to the underlying session, removing it when empty"""
+        if self.session.is_using_defaults():
+            return
+        if value:
+            self.session[key] = value
+        elif key in self.session.session:
+            del self.session.session[key]
+
+    def _load_menus(self, force: bool = False):
+        """Load menus (defaults merged with the session overlay) if version has changed"""
+        stored_version = self._stored("menu_version", 0)
+
+        if force or stored_version != self._version:
             logger.debug(f"Loading menus from session (version {stored_version})")
-            stored_menus = self.session.get("menus", {})
-            self._menus = {
-                menu_id: Menu.from_dict(menu_data)
-                for menu_id, menu_data in stored_menus.items()
-            }
+            defaults = get_default_menus()
+            overlay = self._stored("menu_overlay", {})
+            self._menus = dict(defaults)
+            for menu_id, menu_overlay in overlay.items():
+                self._menus[menu_id] = apply_menu_overlay(
+                    defaults.get(menu_id), menu_id, menu_overlay
+                )
             self._version = stored_version
-            self._cache.clear()  # Clear cache when menus are reloaded
 
-    def _save_menus(self):
-        """Save menus to session with version tracking"""
-        self._version += 1
-        logger.debug(f"Saving menus to session (version {self._version})")
-        menu_dict = {menu_id: menu.to_dict() for menu_id, menu in self._menus.items()}
-        self.session["menu_version"] = self._version
-        self.session["menus"] = menu_dict
-        self._cache.clear()  # Clear cache when menus are saved
-
-    @lru_cache(maxsize=32)
-    def _get_menu_cached(
-        self, menu_id: str, user_authenticated: bool, cache_key: str
-    ) -> Optional[Menu]:
-        """Cached version of menu filtering logic"""
-        if menu_id not in self._menus:
-            return None
+            legacy_menus = self._stored("menus")
+            if legacy_menus is not None:
+                self._migrate_legacy_menus(legacy_menus)
 
-        def filter_items(items: List[MenuItem]) -> List[MenuItem]:
-            filtered = []
-            for item in sorted(items, key=lambda x: x.order):  # Sort while filtering
-                if (
-                    (item.auth_requirement == AuthRequirement.ALL)
-                    or (
-                        user_authenticated
-                        and item.auth_requirement == AuthRequirement.AUTH_ONLY
-                    )
-                    or (
-                        not user_authenticated
-                        and item.auth_requirement == AuthRequirement.UNAUTH_ONLY
-                    )
-                ):
-
-                    if item.item_type == MenuItemType.DROPDOWN:
-                        filtered_nested = filter_items(item.items)
-                        if filtered_nested:
-                            item_copy = MenuItem(
-                                id=item.id,
-                                item_type=item.item_type,
-                                menu_text=item.menu_text,
-                                menu_class=item.menu_class,
-                                url=item.url,
-                                auth_requirement=item.auth_requirement,
-                                icon=item.icon,
-                                icon_class=item.icon_class,
-                                alt_icon=item.alt_icon,
-                                alt_icon_class=item.alt_icon_class,
-                                alt_status=item.alt_status,
-                                secondary_text=item.secondary_text,
-                                secondary_class=item.secondary_class,
-                                new_window=item.new_window,
-                                order=item.order,
-                                items=filtered_nested,
-                            )
-                            filtered.append(item_copy)
-                    else:
-                        filtered.append(item)
-            return filtered
+    def _migrate_legacy_menus(self, legacy_menus: Dict):
+        """Convert a full per-session menu copy into an overlay"""
+        logger.info("Converting session menus to an overlay")
+        for menu_id, menu_data in legacy_menus.items():
+            menu = Menu.from_dict(menu_data)
+            menu.mark_dirty()
+            self._menus[menu_id] = menu
+        self._store("menus", None)
+        self._save_menus()
 
+    def _get_editable_menu(self, menu_id: str) -> Menu:
+        """Get a menu that is safe to modify, copying the shared default if needed"""
         menu = self._menus[menu_id]
-        filtered_items = filter_items(menu.items)
-        return Menu(menu_id=menu.menu_id, items=filtered_items)
+        if menu is get_default_menus().get(menu_id):
+            content_hash = menu.content_hash
+            menu = Menu.from_normalized(menu.to_dict())
+            menu._content_hash = content_hash  # Same content, so edits can derive from it
+            self._menus[menu_id] = menu
+        return menu
+
+    def _save_menus(self):
+        """Save overlays of dirty menus to session with version tracking.
+
+        Clean menus keep their stored overlay, and nothing is written when the
+        overlay is unchanged (e.g. an item toggled back to its stored state).
+        Menus changed only through add_item/remove_item/update_item just have
+        those items compared with the default.
+        """
+        defaults = get_default_menus()
+        stored = self._stored("menu_overlay", {})
+        overlay = dict(stored)
+        for menu_id, menu in self._menus.items():
+            if not menu.is_dirty:
+                continue
+            touched = menu.touched_items()
+            menu.mark_clean()
+            default = defaults.get(menu_id)
+            if menu is default:
+                continue
+            if touched is None:
+                menu_overlay = build_menu_overlay(default, menu)
+            else:
+                menu_overlay = update_menu_overlay(
+                    default, menu, stored.get(menu_id, {}), touched
+                )
+            if menu_overlay or default is None:
+                overlay[menu_id] = menu_overlay
+            else:
+                overlay.pop(menu_id, None)
+
+        if overlay == stored:
+            logger.debug("Menu overlay unchanged, skipping session write")
+            return
+        self._write_overlay(overlay)
+
+    def _write_overlay(self, overlay: Dict):
+        """Store the overlay and bump the menu version"""
+        self._version = self._version + 1 if overlay else 0
+        logger.debug(f"Saving menu overlay to session (version {self._version})")
+        self._store("menu_version", self._version)
+        self._store("menu_overlay", overlay)
+        self._invalidate_served_menus()
+
+    def _invalidate_served_menus(self):
+        """Evict filtered menus this manager served for content that has since changed"""
+        defaults = get_default_menus()
+        for menu_id, content_hash in list(self._served_hashes.items()):
+            menu = self._menus.get(menu_id)
+            if menu is not None and menu.content_hash == content_hash:
+                continue
+            default = defaults.get(menu_id)
+            if default is None or default.content_hash != content_hash:
+                filtered_menu_cache.invalidate(content_hash)
+            del self._served_hashes[menu_id]
 
     def get_menu(
         self, menu_id: str, user_authenticated: bool = False
     ) -> Optional[Menu]:
-        """Get menu with caching"""
+        """Get the menu filtered for the user, served from the shared cache"""
         self._load_menus()  # Check for updates
+        return self._get_filtered_menu(menu_id, bool(user_authenticated))
+
+    def get_menus(
+        self, menu_ids: Iterable[str], user_authenticated: bool = False
+    ) -> Dict[str, Optional[Menu]]:
+        """Get several filtered menus at once, keyed by menu id for the template context"""
+        self._load_menus()  # Check for updates once for the whole batch
+        user_authenticated = bool(user_authenticated)
+        return {
+            menu_id: self._get_filtered_menu(menu_id, user_authenticated)
+            for menu_id in menu_ids
+        }
 
+    def has_user_overrides(self) -> bool:
+        """Whether this session's menus differ from the shared defaults"""
+        return bool(self._stored("menu_overlay"))
+
+    def menus_version(self, menu_ids: Iterable[str]) -> str:
+        """Fingerprint of the given menus' content, for keying cached output"""
+        self._load_menus()  # Check for updates
+        return hashlib.md5(
+            "|".join(
+                self._menus[menu_id].content_hash if menu_id in self._menus else ""
+                for menu_id in menu_ids
+            ).encode()
+        ).hexdigest()
+
+    def _get_filtered_menu(
+        self, menu_id: str, user_authenticated: bool
+    ) -> Optional[Menu]:
+        """Get a filtered menu from the shared cache, filtering it on a miss"""
         menu = self._menus.get(menu_id)
         if not menu:
             return None
 
-        cache_key = hashlib.md5(
-            f"{menu_id}_{user_authenticated}_{menu._version}_{self._version}".encode()
-        ).hexdigest()
+        # Shared defaults hold their own projections for the life of the process
+        if menu is get_default_menus().get(menu_id):
+            return menu.visible_to(user_authenticated)
 
-        return self._get_menu_cached(menu_id, user_authenticated, cache_key)
+        # Overlay menus are rebuilt per request, so share projections by content
+        content_hash = menu.content_hash
+        self._served_hashes[menu_id] = content_hash
+        filtered = filtered_menu_cache.get(content_hash, user_authenticated)
+        if filtered is None:
+            filtered = menu.visible_to(user_authenticated)
+            filtered_menu_cache.set(content_hash, user_authenticated, filtered)
+        return filtered
 
     def create_menu(self, menu_id: str, name: str):
         """Create a new menu"""
@@ -352,25 +976,10 @@ class MenuManager:
         if menu_id not in self._menus:
             logger.info(f"Creating new menu '{menu_id}'")
             new_menu = Menu(menu_id=menu_id, items=[])
-            new_menu.mark_clean()
+            new_menu.mark_dirty()
             self._menus[menu_id] = new_menu
             self._save_menus()
 
-    def _reorder_menu(self, menu_id: str):
-        """Reorder menu items by order field recursively"""
-
-        def sort_items(items: List[MenuItem]):
-            # Sort current level
-            items.sort(key=lambda x: x.order)
-            # Recursively sort children
-            for item in items:
-                if item.item_type == MenuItemType.DROPDOWN and item.items:
-                    sort_items(item.items)
-
-        if menu_id in self._menus:
-            sort_items(self._menus[menu_id].items)
-            self._menus[menu_id].mark_dirty()
-
     def add_item(
         self,
         menu_id: str,
@@ -382,87 +991,88 @@ class MenuManager:
         if menu_id not in self._menus:
             raise ValueError(f"Menu '{menu_id}' does not exist")
 
-        menu = self._menus[menu_id]
-        item.parent_menu = menu
+        menu = self._get_editable_menu(menu_id)
 
-        # Only modify order if it's not already set
+        # Only modify order if it's not already set (items are kept sorted)
         if item.order == 0:
             if position == MenuPosition.TOP:
-                min_order = min((item.order for item in menu.items), default=0)
+                min_order = menu.items[0].order if menu.items else 0
                 item.order = min_order - 10
             elif position == MenuPosition.BOTTOM:
-                max_order = max((item.order for item in menu.items), default=0)
+                max_order = menu.items[-1].order if menu.items else 0
                 item.order = max_order + 10
             elif position in (MenuPosition.BEFORE, MenuPosition.AFTER) and relative_to:
-                for existing in menu.items:
-                    if existing.id == relative_to:
-                        if position == MenuPosition.BEFORE:
-                            item.order = existing.order - 5
-                        else:  # AFTER
-                            item.order = existing.order + 5
-                        break
+                existing = menu.find_item(relative_to)
+                if existing and menu.find_parent(relative_to) is None:
+                    if position == MenuPosition.BEFORE:
+                        item.order = existing.order - 5
+                    else:  # AFTER
+                        item.order = existing.order + 5
 
         menu.add_item(item)
-        self._reorder_menu(menu_id)
         self._save_menus()
 
     def remove_item(self, menu_id: str, item_id: str):
         """Remove a menu item"""
-        if menu_id in self._menus:
-            menu = self._menus[menu_id]
-            menu.items = [item for item in menu.items if item.id != item_id]
-            menu.mark_dirty()
+        if menu_id in self._menus and self._menus[menu_id].find_item(item_id):
+            self._get_editable_menu(menu_id).remove_item(item_id)
             self._save_menus()
 
     def add_dropdown_item(self, menu_id: str, parent_id: str, item: MenuItem):
         """Add an item to a dropdown menu"""
-        if menu_id in self._menus:
-
-            def add_to_dropdown(items: List[MenuItem]) -> bool:
-                for menu_item in items:
-                    if menu_item.id == parent_id:
-                        if menu_item.item_type == MenuItemType.DROPDOWN:
-                            # Set order if not specified
-                            if item.order == 0:
-                                max_order = max(
-                                    (i.order for i in menu_item.items), default=0
-                                )
-                                item.order = max_order + 10
-                            menu_item.add_item(item)
-                            return True
-                        return False
-                    elif menu_item.item_type == MenuItemType.DROPDOWN:
-                        if add_to_dropdown(menu_item.items):
-                            return True
-                return False
-
-            if add_to_dropdown(self._menus[menu_id].items):
-                self._reorder_menu(menu_id)  # Make sure to reorder after adding
-                self._save_menus()
+        if menu_id not in self._menus:
+            return
+        menu_item = self._menus[menu_id].find_item(parent_id)
+        if not menu_item or menu_item.item_type != MenuItemType.DROPDOWN:
+            return
 
-    def initialize_default_menus(self):
-        """Initialize menus with defaults"""
-        from app.defaults import DEFAULT_MENUS
+        menu = self._get_editable_menu(menu_id)
+        # Set order if not specified
+        if item.order == 0:
+            dropdown = menu.find_item(parent_id)
+            item.order = (dropdown.items[-1].order if dropdown.items else 0) + 10
+        menu.add_item(item, parent_id=parent_id)
+        self._save_menus()
 
-        logger.info(f"Initializing default menus")
-        self._menus.clear()
-        self._cache.clear()
+    def find_item(self, menu_id: str, item_id: str) -> Optional[MenuItem]:
+        """Find an item by id; the result may be shared, so change it with update_item"""
+        menu = self._menus.get(menu_id)
+        return menu.find_item(item_id) if menu else None
 
-        for menu_id, menu_config in DEFAULT_MENUS.items():
-            # Create the menu directly with all items at once
-            menu = Menu.from_dict(menu_config)
-            self._menus[menu_id] = menu
+    def update_item(self, menu_id: str, item_id: str, **changes) -> bool:
+        """Change an item's fields, e.g. update_item('user_menu', 'inbox', secondary_text='3')"""
+        if menu_id not in self._menus or not self._menus[menu_id].find_item(item_id):
+            return False
+        self._get_editable_menu(menu_id).update_item(item_id, **changes)
+        self._save_menus()
+        return True
 
+    def toggle_alt_state(self, menu_id: str, item_id: str) -> bool:
+        """Toggle an item between its normal and alternate states"""
+        item = self._menus[menu_id].find_item(item_id) if menu_id in self._menus else None
+        if not item:
+            return False
+        self._get_editable_menu(menu_id).update_item(item_id, alt_status=not item.alt_status)
         self._save_menus()
+        return True
+
+    def initialize_default_menus(self):
+        """Reset menus to the defaults, discarding any per-user changes"""
+        logger.info(f"Initializing default menus")
+        self._menus = dict(get_default_menus())
+        if self._stored("menu_overlay"):
+            self._write_overlay({})
 
     @classmethod
     def ensure_default_menus(cls, session_manager: UserSessionManager):
-        """Ensure default menus exist in session"""
-        # logger.debug(f"Checking session for menus: {list(session_manager.session.keys())}")
-        if "menus" not in session_manager.session:
-            # logger.warning("No menus found in session - initializing defaults")
-            menu_manager = cls(session_manager)
-            menu_manager.initialize_default_menus()
-            return menu_manager
-        # logger.debug("Found existing menus in session")
+        """Get a menu manager; the defaults are shared, so nothing is copied into the session"""
         return cls(session_manager)
+
+
+def get_menu_manager(request) -> MenuManager:
+    """Get the request's MenuManager, loading menus and overlays once per request"""
+    manager = getattr(request, "_menu_manager", None)
+    if manager is None:
+        manager = MenuManager.ensure_default_menus(get_session_manager(request))
+        request._menu_manager = manager
+    return manager
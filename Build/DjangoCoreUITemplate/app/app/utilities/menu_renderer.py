@@ -0,0 +1,143 @@
+# app/utilities/menu_renderer.py
+"""
+Render a Menu tree to HTML in a single pass.
+
+Each style mirrors the markup CoreUI expects for that part of the page:
+    'sidebar'      - sidebar nav, dropdowns become (nested) nav-groups
+    'header_left'  - header nav items on the left
+    'header_right' - header nav items on the right
+    'user'         - items inside the avatar dropdown
+
+Dropdowns nest to any depth.  Inside a dropdown-menu (header and user styles)
+a nested dropdown is shown as a dropdown-header followed by its items.
+"""
+from typing import Callable, Dict, List
+
+from django.utils.html import conditional_escape as esc
+
+from .enums import MenuItemType
+from .menu_manager import Menu, MenuItem
+
+NAV_SEPARATOR = '<div class="vr h-100 mx-2 text-body text-opacity-75"></div>'
+BULLET_ICON = '<span class="nav-icon"><span class="nav-icon-bullet"></span></span>'
+
+
+def _icon(out: List[str], item: MenuItem, css_class: str, alt_class: bool = True):
+    """Write an item's svg icon, adding alt_icon_class while in the alternate state"""
+    if alt_class and item.alt_status and item.alt_icon_class:
+        css_class = f"{css_class} {esc(item.alt_icon_class)}"
+    out.append(f'<svg class="{css_class}">\n<use xlink:href="{esc(item.icon)}"></use>\n</svg>')
+
+
+def _secondary(out: List[str], item: MenuItem):
+    """Write an item's secondary text (e.g. a badge)"""
+    if item.secondary_text:
+        out.append(f'<span class="{esc(item.secondary_class)}">{esc(item.secondary_text)}</span>')
+
+
+def _text(item: MenuItem) -> str:
+    """An item's text wrapped in its menu_class span"""
+    return f'<span class="{esc(item.menu_class)}">{esc(item.menu_text)}</span>'
+
+
+def _sidebar_item(out: List[str], item: MenuItem, depth: int = 0):
+    """Sidebar nav items; items inside a nav-group get a bullet instead of an icon"""
+    item_type = item.item_type
+    if item_type == MenuItemType.HEADER:
+        out.append(f'<li class="nav-title">{esc(item.menu_text)}</li>')
+    elif item_type == MenuItemType.SEPARATOR:
+        out.append('<li class="nav-divider"></li>')
+    elif item_type == MenuItemType.LINK:
+        out.append(f'<li class="nav-item">\n<a class="nav-link" href="{esc(item.url)}">')
+        if depth:
+            out.append(BULLET_ICON)
+        elif item.icon:
+            _icon(out, item, 'nav-icon')
+        out.append(esc(item.menu_text))
+        _secondary(out, item)
+        out.append('</a>\n</li>')
+    elif item_type == MenuItemType.DROPDOWN:
+        out.append('<li class="nav-group">\n<a class="nav-link nav-group-toggle" href="#">')
+        if depth:
+            out.append(BULLET_ICON)
+        elif item.icon:
+            _icon(out, item, 'nav-icon', alt_class=False)
+        out.append(esc(item.menu_text))
+        out.append('</a>\n<ul class="nav-group-items compact">')
+        for child in item.items:
+            _sidebar_item(out, child, depth + 1)
+        out.append('</ul>\n</li>')
+
+
+def _dropdown_item(out: List[str], item: MenuItem):
+    """Items inside a dropdown-menu (the user menu and header dropdowns)"""
+    item_type = item.item_type
+    if item_type == MenuItemType.HEADER:
+        out.append(
+            '<div class="dropdown-header bg-body-tertiary text-body-secondary fw-semibold my-2">'
+            f'{esc(item.menu_text)}</div>'
+        )
+    elif item_type == MenuItemType.SEPARATOR:
+        out.append('<div class="dropdown-divider"></div>')
+    elif item_type == MenuItemType.LINK:
+        out.append(f'<a class="dropdown-item" href="{esc(item.url)}">')
+        if item.icon:
+            _icon(out, item, 'icon me-2', alt_class=False)
+        out.append(_text(item))
+        _secondary(out, item)
+        out.append('</a>')
+    elif item_type == MenuItemType.DROPDOWN:
+        out.append(
+            '<div class="dropdown-header bg-body-tertiary text-body-secondary fw-semibold my-2">'
+            f'{esc(item.menu_text)}</div>'
+        )
+        for child in item.items:
+            _dropdown_item(out, child)
+
+
+def _header_item(out: List[str], item: MenuItem):
+    """Header nav items; dropdowns open a dropdown-menu"""
+    item_type = item.item_type
+    if item_type == MenuItemType.SEPARATOR:
+        out.append(NAV_SEPARATOR)
+    elif item_type == MenuItemType.LINK:
+        out.append(f'<li class="nav-item">\n<a class="nav-link" href="{esc(item.url)}">')
+        if item.icon:
+            _icon(out, item, 'icon icon-lg')
+        out.append(_text(item))
+        _secondary(out, item)
+        out.append('</a>\n</li>')
+    elif item_type == MenuItemType.DROPDOWN:
+        out.append(
+            '<li class="nav-item dropdown">\n'
+            '<a class="nav-link dropdown-toggle" data-coreui-toggle="dropdown" href="#" '
+            'role="button" aria-haspopup="true" aria-expanded="false">'
+        )
+        if item.icon:
+            _icon(out, item, 'icon icon-lg')
+        out.append(_text(item))
+        out.append('</a>\n<div class="dropdown-menu">')
+        for child in item.items:
+            _dropdown_item(out, child)
+        out.append('</div>\n</li>')
+    # Header items have no markup in the header nav
+
+
+MENU_STYLES: Dict[str, Callable[..., None]] = {
+    'sidebar': _sidebar_item,
+    'header_left': _header_item,
+    'header_right': _header_item,
+    'user': _dropdown_item,
+}
+
+
+def render_menu_html(menu: Menu, style: str = 'sidebar') -> str:
+    """Render an (already auth-filtered) menu's items in the given style"""
+    try:
+        render_item = MENU_STYLES[style]
+    except KeyError:
+        raise ValueError(f"Unknown menu style '{style}'") from None
+    out: List[str] = []
+    for item in menu.items:
+        render_item(out, item)
+    return '\n'.join(out)
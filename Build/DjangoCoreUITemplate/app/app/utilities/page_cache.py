@@ -0,0 +1,188 @@
+# app/utilities/page_cache.py
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from app.models import settings_stamp
+from .menu_manager import get_menu_manager
+from .mixins import CHROME_MENU_IDS
+from .session_manager import get_session_manager
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_KEY = 'page_html'
+# The page versions a cached page is keyed on; the rest only affect validation
+PAGE_CACHE_KEY_VERSIONS = ('path', 'user', 'settings', 'menus', 'theme', 'templates')
+# Left by render_breadcrumbs in pages being cached, and filled in per request
+BREADCRUMBS_PLACEHOLDER = '<!-- breadcrumbs -->'
+
+# Newest template mtime (seconds), found once per process
+_templates_mtime: Optional[int] = None
+
+
+def fingerprint(value) -> str:
+    """Short stable hash of a JSON-serialisable value"""
+    return hashlib.md5(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def templates_mtime() -> int:
+    """Newest mtime of any file in the template DIRS, in whole seconds
+
+    Without DEBUG the cached loader never reloads a template, so the value
+    found at first use holds for the life of the process.  Pages aren't
+    validated with DEBUG on (see ConditionalPageMixin), so edited templates
+    never need another walk.
+    """
+    global _templates_mtime
+    if _templates_mtime is None:
+        newest = 0
+        for template_dir in engines['django'].engine.dirs:
+            for root, dirs, files in os.walk(template_dir):
+                for file in files:
+                    try:
+                        newest = max(newest, os.stat(os.path.join(root, file)).st_mtime_ns)
+                    except FileNotFoundError:
+                        pass
+        _templates_mtime = newest // 1_000_000_000
+    return _templates_mtime
+
+
+def render_breadcrumbs_html(breadcrumbs, user) -> str:
+    return render_to_string('includes/breadcrumbs.html', {'breadcrumbs': breadcrumbs, 'user': user})
+
+
+class ConditionalPageMixin:
+    """Validators for BaseContextMixin views, checked before anything renders.
+
+    The ETag is a weak hash of everything the page chrome depends on: path,
+    user, settings (APP_SETTING_ID and the AppSetting stamp), the session's
+    setting overrides, the menus' content, theme, breadcrumb trail and
+    template mtimes.  A matching If-None-Match is answered with a 304 before
+    the view builds its context, so revalidation never renders a template.
+    There is no Last-Modified: a date can't express a login or a menu or
+    breadcrumb change, so If-Modified-Since would serve stale chrome.
+
+    Nothing is validated with DEBUG on, where templates are edited between
+    requests and finding their mtimes would mean a directory walk per page.
+
+    Only use it on views whose output depends on nothing else; pages that
+    show flash messages or query results are not safe.
+    """
+
+    def get_page_versions(self, request) -> Optional[Dict]:
+        """What the page depends on, or None when it must not be validated"""
+        if request.method not in ('GET', 'HEAD') or settings.DEBUG:
+            return None
+        session = get_session_manager(request)
+        menu_manager = get_menu_manager(request)
+        user = request.user
+        return {
+            'path': request.get_full_path(),
+            'user': user.pk if user.is_authenticated else None,
+            'settings': [settings.APP_SETTING_ID, settings_stamp()],
+            'setting_overrides': session.get_overrides(),
+            'menus': menu_manager.menus_version(CHROME_MENU_IDS),
+            'menu_overrides': menu_manager.has_user_overrides(),
+            'theme': session.get_theme(),
+            'breadcrumbs': session.get_breadcrumbs(),
+            'templates': templates_mtime(),
+        }
+
+    def dispatch(self, request, *args, **kwargs):
+        versions = self.get_page_versions(request)
+        if versions is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = f'W/"{fingerprint(versions)}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                self.add_validators(not_modified, etag)
+            return not_modified
+
+        response = self.get_page_response(request, versions, *args, **kwargs)
+        if response.status_code == 200:
+            self.add_validators(response, etag)
+        return response
+
+    def add_validators(self, response, etag):
+        """Headers shared by the 200 and the 304, which vary with the session"""
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+
+    def get_page_response(self, request, versions, *args, **kwargs):
+        """Build the response once validation has failed"""
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PageCacheMixin(ConditionalPageMixin):
+    """Opt-in full-page cache for BaseContextMixin views.
+
+    Put it before BaseContextMixin in the bases and set PAGE_CACHE_TIMEOUT.
+    Rendered pages are stored in the default cache keyed by what the request
+    asks for (path, signed-in user, settings and menu versions, theme and
+    template mtimes), so anything that changes the chrome changes the key
+    rather than needing an invalidation.  The breadcrumb trail differs per
+    visitor, so it is left out of the stored page and rendered into it on
+    every response.  Sessions with their own settings or menus always render.
+
+    Only anonymous requests are cached unless page_cache_authenticated is
+    set; the header shows the signed-in user's details, so authenticated
+    entries are also keyed by user.
+    """
+    page_cache_timeout: Optional[int] = None  # None uses settings.PAGE_CACHE_TIMEOUT
+    page_cache_authenticated = False
+
+    def get_page_cache_timeout(self) -> int:
+        if self.page_cache_timeout is not None:
+            return self.page_cache_timeout
+        return getattr(settings, 'PAGE_CACHE_TIMEOUT', 0)
+
+    def get_page_cache_key(self, request, versions) -> Optional[str]:
+        """The cache key for this request, or None when it must not be cached"""
+        if not self.get_page_cache_timeout() or versions['menu_overrides'] or versions['setting_overrides']:
+            return None
+        if request.user.is_authenticated and not self.page_cache_authenticated:
+            return None
+        return f"{PAGE_CACHE_KEY}:{fingerprint({name: versions[name] for name in PAGE_CACHE_KEY_VERSIONS})}"
+
+    def insert_breadcrumbs(self, request, content: bytes) -> bytes:
+        """Fill a cached page's breadcrumb placeholder with this request's trail"""
+        html = render_breadcrumbs_html(get_session_manager(request).get_breadcrumbs(), request.user)
+        return content.replace(BREADCRUMBS_PLACEHOLDER.encode(), html.encode(settings.DEFAULT_CHARSET), 1)
+
+    def get_page_response(self, request, versions, *args, **kwargs):
+        key = self.get_page_cache_key(request, versions)
+        if key is None:
+            return super().get_page_response(request, versions, *args, **kwargs)
+
+        cached = cache.get(key)
+        if cached is not None:
+            content_type, content = cached
+            response = HttpResponse(self.insert_breadcrumbs(request, content), content_type=content_type)
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        response = super().get_page_response(request, versions, *args, **kwargs)
+        if response.status_code != 200 or not hasattr(response, 'add_post_render_callback'):
+            return response
+        response.context_data['defer_breadcrumbs'] = True
+
+        def store(rendered):
+            # Runs after the template middleware hooks have added their context
+            cache.set(key, (rendered['Content-Type'], rendered.content), self.get_page_cache_timeout())
+            rendered.content = self.insert_breadcrumbs(request, rendered.content)
+            rendered['X-Page-Cache'] = 'miss'
+
+        response.add_post_render_callback(store)
+        return response
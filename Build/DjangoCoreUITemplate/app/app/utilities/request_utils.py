@@ -1,7 +1,59 @@
 # app/utilities/request_utils.py
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from urllib.parse import urlparse
+
+from django.urls import Resolver404, resolve
 
 def is_ajax(request):
     """
     Check if a request is AJAX
     """
     return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+class PageInfo(NamedTuple):
+    """What breadcrumbs need to know about a path"""
+    resolved: bool
+    url_name: Optional[str]
+    title: str
+
+def fallback_title(url):
+    """Title from the last path segment, for URLs that don't resolve"""
+    return url.strip("/").split("/")[-1].replace("-", " ").title()
+
+@lru_cache(maxsize=1024)
+def page_info(path) -> PageInfo:
+    """
+    Resolve a path to its URL name and page title, at most once per path per process
+    """
+    try:
+        resolver_match = resolve(path)
+    except Resolver404:
+        return PageInfo(False, None, fallback_title(path))
+
+    # Try to get title from view, then from the URL name
+    if hasattr(resolver_match.func, "page_title"):
+        title = resolver_match.func.page_title
+    elif resolver_match.url_name:
+        title = resolver_match.url_name.replace("_", " ").title()
+    else:
+        title = fallback_title(path)
+    return PageInfo(True, resolver_match.url_name, title)
+
+@lru_cache(maxsize=1024)
+def format_url_to_name(url):
+    """Convert URL's last segment to camel case name with additional handling"""
+    path = urlparse(url).path
+    last_segment = path.rstrip("/").split("/")[-1]
+    name = re.sub(r"\.[^.]+$", "", last_segment)
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name)
+    words = re.split(r"[^a-zA-Z0-9]+", name)
+    words = [word.strip() for word in words if word.strip()]
+    name = " ".join(word.capitalize() for word in words)
+
+    abbreviations = {"Url": "URL", "Id": "ID", "Html": "HTML"}
+    for original, replacement in abbreviations.items():
+        name = name.replace(original, replacement)
+
+    return name
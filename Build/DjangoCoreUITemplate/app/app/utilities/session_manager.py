@@ -1,23 +1,78 @@
 # session_manager.py
+import json
 import logging
-import re
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, Optional
-from urllib.parse import urlparse
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.messages import get_messages
-from django.urls import resolve
+
+from .request_utils import format_url_to_name, page_info
 
 logger = logging.getLogger(__name__)
 
+# Used when settings.BREADCRUMB_STORAGE is 'cookie'
+BREADCRUMB_COOKIE = "breadcrumbs"
+BREADCRUMB_COOKIE_SALT = "app.breadcrumbs"
+
+# Session key holding only the settings a user changed from the defaults
+SETTINGS_OVERLAY_KEY = "settings_overlay"
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def get_default_settings() -> Mapping[str, Any]:
+    """Read-only DEFAULT_APP_SETTINGS (plus settings_version), shared by the process"""
+    return MappingProxyType(
+        dict(settings.DEFAULT_APP_SETTINGS, settings_version=settings.APP_SETTING_ID)
+    )
+
+
+# The site defaults last built from request.app_settings, as (source, merged)
+_site_defaults = (None, None)
+
+
+def get_site_defaults(app_settings) -> Mapping[str, Any]:
+    """DEFAULT_APP_SETTINGS overlaid with the database AppSetting values
+
+    app_settings is the shared mapping SettingsMiddleware attaches, which
+    stays the same object until the settings change, so the merge is only
+    redone then.
+    """
+    global _site_defaults
+    source, merged = _site_defaults
+    if source is not app_settings:
+        merged = MappingProxyType(dict(
+            get_default_settings(),
+            **{key: value for key, value in app_settings.items() if key not in ("setting_id", "settings_version")},
+        ))
+        _site_defaults = (app_settings, merged)
+    return merged
+
+
+def get_session_manager(request) -> "UserSessionManager":
+    """Get the request's UserSessionManager, building it on first use"""
+    manager = getattr(request, "_session_manager", None)
+    if manager is None:
+        manager = UserSessionManager(request)
+        request._session_manager = manager
+    return manager
+
 
 class UserSessionManager:
-    """Manage user session data"""
+    """Manage user session data (use get_session_manager to share one per request)"""
 
     def __init__(self, request):
+        # Counts constructions per request; the debug page shows it should be 1
+        request.session_manager_builds = getattr(request, "session_manager_builds", 0) + 1
+        self.request = request
         self.session = getattr(request, "session", None)
+        self._breadcrumb_cookie = None  # Trail to write to the cookie, if changed
+        self._merged_settings = None
         self.modified = False
 
         # If no session is available, use a dummy session
@@ -26,31 +81,27 @@ class UserSessionManager:
             self._use_default_settings()
             return
 
-        # Check settings version and reset if needed
-        current_settings = self.session.get("app_settings", {})
-        if current_settings.get("settings_version") != settings.APP_SETTING_ID:
-            logger.debug("Settings version mismatch, reinitializing")
-            self.initialize_settings()
-            return
+        # Sessions written before the overlay hold a full copy of the settings
+        if "app_settings" in self.session:
+            self._migrate_legacy_settings()
 
-        # Initialize settings if they haven't been set yet
-        if "app_settings" not in self.session:
-            logger.debug("Initializing settings in session")
-            self.initialize_settings()
+        # Drop overrides made against another version of the defaults
+        overlay = self.session.get(SETTINGS_OVERLAY_KEY)
+        if overlay and overlay.get("settings_version") != settings.APP_SETTING_ID:
+            logger.debug("Settings version mismatch, dropping overrides")
+            self._set_overrides({})
 
     def __delitem__(self, key: str) -> None:
-        """Delete item using dictionary syntax"""
+        """Delete item using dictionary syntax (it falls back to its default)"""
         if self.is_using_defaults():
             if key in self._settings:
                 del self._settings[key]
             return
 
-        if "app_settings" in self.session:
-            app_settings = self.session["app_settings"]
-            if key in app_settings:
-                del app_settings[key]
-                self.session["app_settings"] = app_settings
-                self.modified = True
+        overrides = self._get_overrides()
+        if key in overrides:
+            del overrides[key]
+            self._set_overrides(overrides)
 
     def __getattr__(self, name):
         """Handle attribute access when no session is available"""
@@ -74,21 +125,15 @@ class UserSessionManager:
             "breadcrumbs": [],
         }
 
+    def _defaults(self) -> Mapping[str, Any]:
+        """The settings users' overrides apply to: the database values when
+        SettingsMiddleware attached them, otherwise DEFAULT_APP_SETTINGS"""
+        app_settings = getattr(self.request, "app_settings", None)
+        return get_site_defaults(app_settings) if app_settings else get_default_settings()
+
     def _format_url_to_name(self, url):
         """Convert URL's last segment to camel case name with additional handling"""
-        path = urlparse(url).path
-        last_segment = path.rstrip("/").split("/")[-1]
-        name = re.sub(r"\.[^.]+$", "", last_segment)
-        name = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name)
-        words = re.split(r"[^a-zA-Z0-9]+", name)
-        words = [word.strip() for word in words if word.strip()]
-        name = " ".join(word.capitalize() for word in words)
-
-        abbreviations = {"Url": "URL", "Id": "ID", "Html": "HTML"}
-        for original, replacement in abbreviations.items():
-            name = name.replace(original, replacement)
-
-        return name
+        return format_url_to_name(url)
 
     def _validate_breadcrumb(self, breadcrumb):
         """Validate breadcrumb data structure"""
@@ -97,6 +142,39 @@ class UserSessionManager:
         required_keys = ["url", "title"]
         return all(key in breadcrumb for key in required_keys)
 
+    def _migrate_legacy_settings(self) -> None:
+        """Replace a full app_settings copy with an overlay of the values that differ"""
+        legacy = self.session.pop("app_settings")
+        overrides = {}
+        if legacy.get("settings_version") == settings.APP_SETTING_ID:
+            defaults = self._defaults()
+            overrides = {
+                key: value
+                for key, value in legacy.items()
+                if defaults.get(key, _MISSING) != value
+            }
+        self._set_overrides(overrides)
+
+    def _get_overrides(self) -> Dict[str, Any]:
+        """Get a copy of the user's changed settings (without settings_version)"""
+        overlay = self.session.get(SETTINGS_OVERLAY_KEY) or {}
+        return {key: value for key, value in overlay.items() if key != "settings_version"}
+
+    def _set_overrides(self, overrides: Dict[str, Any]) -> None:
+        """Store the user's changed settings, writing the session only if they differ"""
+        self._merged_settings = None
+        if overrides:
+            overlay = dict(overrides, settings_version=settings.APP_SETTING_ID)
+            if self.session.get(SETTINGS_OVERLAY_KEY) == overlay:
+                return
+            self.session[SETTINGS_OVERLAY_KEY] = overlay
+        elif SETTINGS_OVERLAY_KEY in self.session:
+            del self.session[SETTINGS_OVERLAY_KEY]
+        else:
+            return
+        self.modified = True
+        self.save()
+
     def _validate_key_value(self, key: str, value: Any) -> bool:
         """Validate key and value before storing"""
         if not isinstance(key, str):
@@ -104,46 +182,89 @@ class UserSessionManager:
             return False
         return True
 
-    def _get_session_settings(self) -> Dict[str, Any]:
-        """Safely get settings from session"""
-        try:
-            if self.is_using_defaults():
-                return self._settings
-            return self.session.get("app_settings", {})
-        except Exception as e:
-            logger.warning(f"Error accessing session settings: {e}")
-            return settings.DEFAULT_APP_SETTINGS.copy()
-
-    def add_breadcrumb(self, path):
-        """Add a path to breadcrumbs, handling duplicates by moving them to the end"""
-        if self.is_using_defaults():
+    def _uses_breadcrumb_cookie(self) -> bool:
+        """Check if breadcrumbs live in a signed cookie instead of the session"""
+        return getattr(settings, "BREADCRUMB_STORAGE", "session") == "cookie"
+
+    def _get_breadcrumb_trail(self) -> List[List[str]]:
+        """Get breadcrumbs as compact [title, url] pairs, oldest first"""
+        if self._uses_breadcrumb_cookie():
+            if self._breadcrumb_cookie is not None:
+                return self._breadcrumb_cookie
+            raw = self.request.get_signed_cookie(
+                BREADCRUMB_COOKIE, default=None, salt=BREADCRUMB_COOKIE_SALT
+            )
+            try:
+                trail = json.loads(raw) if raw else []
+            except ValueError:
+                trail = []
+        else:
+            trail = self.session.get("breadcrumbs", [])
+
+        # Sessions written before the compact format hold {'title', 'url'} dicts
+        return [
+            [crumb["title"], crumb["url"]] if isinstance(crumb, dict) else crumb
+            for crumb in trail
+        ]
+
+    def _set_breadcrumb_trail(self, trail: List[List[str]]) -> None:
+        """Store breadcrumbs; in cookie mode write_breadcrumb_cookie sends them"""
+        if self._uses_breadcrumb_cookie():
+            self._breadcrumb_cookie = trail
             return
 
-        # Get current breadcrumbs (now a list of dictionaries with title and path)
-        breadcrumbs = self.session.get("breadcrumbs", [])
-        max_crumbs = self.get_setting("max_breadcrumbs", 5)
-        pagetitle = self.get_page_title(path)
-        
-        # Create breadcrumb entry with both title and path
-        new_crumb = {'title': pagetitle, 'url': path}
+        if trail:
+            self.session["breadcrumbs"] = trail
+        elif "breadcrumbs" in self.session:
+            del self.session["breadcrumbs"]
+        self.modified = True
+        self.save()
+
+    def add_breadcrumb(self, path, pagetitle: Optional[str] = None) -> bool:
+        """Add a path to breadcrumbs, handling duplicates by moving them to the end
 
-        # Remove existing entry with same title
-        breadcrumbs = [b for b in breadcrumbs if b['title'] != pagetitle]
+        Returns whether the trail changed; reloading the current page does not
+        write to the session (or cookie) at all.  Pass pagetitle when the
+        caller has already resolved the path.
+        """
+        if self.is_using_defaults():
+            return False
 
-        # Add new breadcrumb
-        breadcrumbs.append(new_crumb)
+        trail = self._get_breadcrumb_trail()
+        if pagetitle is None:
+            pagetitle = self.get_page_title(path)
+
+        # Ring buffer of the latest max_breadcrumbs pages, one entry per title
+        ring = deque(
+            (crumb for crumb in trail if crumb[0] != pagetitle),
+            maxlen=self.get_setting("max_breadcrumbs", 5),
+        )
+        ring.append([pagetitle, path])
+        new_trail = list(ring)
+        if new_trail == trail:
+            return False
 
-        # Trim to max length if needed
-        if len(breadcrumbs) > max_crumbs:
-            breadcrumbs = breadcrumbs[-max_crumbs:]
+        self._set_breadcrumb_trail(new_trail)
+        return True
 
-        # Update session
-        self.session["breadcrumbs"] = breadcrumbs
-        self.modified = True
-        self.save()
+    def write_breadcrumb_cookie(self, response) -> None:
+        """Send changed breadcrumbs to the client when BREADCRUMB_STORAGE is 'cookie'"""
+        if self._breadcrumb_cookie is None:
+            return
+        if self._breadcrumb_cookie:
+            response.set_signed_cookie(
+                BREADCRUMB_COOKIE,
+                json.dumps(self._breadcrumb_cookie, separators=(",", ":")),
+                salt=BREADCRUMB_COOKIE_SALT,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        else:
+            response.delete_cookie(BREADCRUMB_COOKIE, samesite=settings.SESSION_COOKIE_SAMESITE)
 
     def clear_all(self) -> None:
-        self.clear(self)
+        self.clear()
 
     def clear(self) -> None:
         # Clear messages
@@ -161,10 +282,8 @@ class UserSessionManager:
                 del self.session["breadcrumbs"]
 
             # Clear app settings
-            if "app_settings" in self.session:
-                del self.session["app_settings"]
+            self._set_overrides({})
 
-        self.session["app_settings"] = settings.DEFAULT_APP_SETTINGS.copy()
         self.modified = True
         self.save()
 
@@ -173,10 +292,8 @@ class UserSessionManager:
         if self.is_using_defaults():
             return
 
-        if "breadcrumbs" in self.session:
-            del self.session["breadcrumbs"]
-            self.modified = True
-            self.save()
+        if self._get_breadcrumb_trail():
+            self._set_breadcrumb_trail([])
 
     def debug_info(self) -> Dict[str, Any]:
         """Get debug information about current state"""
@@ -184,7 +301,7 @@ class UserSessionManager:
             "using_defaults": self.is_using_defaults(),
             "has_session": hasattr(self, "session"),
             "is_modified": self.modified,
-            "settings_count": len(self.get_all_settings()),
+            "settings_count": len(self.get_all()),
             "has_breadcrumbs": bool(self.get_breadcrumbs()),
         }
 
@@ -193,30 +310,42 @@ class UserSessionManager:
         if self.is_using_defaults():
             return self._settings.get(key, default)
 
-        app_settings = self.session.get("app_settings", {})
-        return app_settings.get(key, default)
+        overlay = self.session.get(SETTINGS_OVERLAY_KEY)
+        if overlay and key in overlay:
+            return overlay[key]
+        return self._defaults().get(key, default)
 
     def _get_session_settings(self) -> Dict[str, Any]:
-        """Safely get settings from session"""
+        """Safely get the merged settings"""
         try:
-            if self.is_using_defaults():
-                return self._settings
-            return self.session.get("app_settings", {})
+            return self.get_all()
         except Exception as e:
             logger.warning(f"Error accessing session settings: {e}")
             return settings.DEFAULT_APP_SETTINGS.copy()
 
     def get_all(self) -> Dict[str, Any]:
-        """Get all settings"""
+        """Get all settings: the defaults merged with the user's overrides"""
         if self.is_using_defaults():
             return self._settings
 
-        if "app_settings" not in self.session:
-            self.initialize_settings()
-        return self.session.get("app_settings", settings.DEFAULT_APP_SETTINGS)
+        if self._merged_settings is None:
+            overlay = self.session.get(SETTINGS_OVERLAY_KEY)
+            self._merged_settings = (
+                dict(self._defaults(), **overlay) if overlay else dict(self._defaults())
+            )
+        return self._merged_settings
     
+    def get_overrides(self) -> Dict[str, Any]:
+        """Get the settings the user changed from the defaults"""
+        if self.is_using_defaults():
+            return {}
+        return self._get_overrides()
+
     def get_breadcrumbs(self):
-        return self.session.get('breadcrumbs', [])
+        """Get breadcrumbs as {'title', 'url'} dicts for templates"""
+        if self.is_using_defaults():
+            return []
+        return [{"title": title, "url": url} for title, url in self._get_breadcrumb_trail()]
     
     # def get_breadcrumbs(self):
     #     """Get formatted breadcrumbs"""
@@ -227,30 +356,20 @@ class UserSessionManager:
     #     return [{"path": c["path"], "title": c["title"]} for c in crumbs]
 
     def get_page_title(self, url):
-        """Get page title for URL"""
-        try:
-            resolver_match = resolve(url)
-            # Try to get title from view
-            if hasattr(resolver_match.func, "page_title"):
-                return resolver_match.func.page_title
-
-            # Default formatting based on URL name
-            return resolver_match.url_name.replace("_", " ").title()
-        except:
-            return url.strip("/").split("/")[-1].replace("-", " ").title()
+        """Get page title for URL (cached per process by page_info)"""
+        return page_info(url).title
 
     def get_setting(self, key, default=None):
         """Get a setting value from session or default app settings"""
         if self.is_using_defaults():
             return settings.DEFAULT_APP_SETTINGS.get(key, default)
 
-        app_settings = self.session.get("app_settings", {})
-        return app_settings.get(key, default)
+        return self.get(key, default)
 
     def get_template_context(self) -> Dict[str, Any]:
         """Get context dictionary for templates"""
         return {
-            "APP_SETTINGS": self.get_all_settings(),
+            "APP_SETTINGS": self.get_all(),
             "DEFAULT_APP_SETTINGS": settings.DEFAULT_APP_SETTINGS,
             "is_using_defaults": self.is_using_defaults(),
             "active_theme": self.get_theme(),
@@ -266,17 +385,12 @@ class UserSessionManager:
         return key in settings_dict
 
     def initialize_settings(self) -> None:
-        """Initialize session with default settings from settings.py"""
-        defaults = settings.DEFAULT_APP_SETTINGS.copy()
-        defaults["settings_version"] = settings.APP_SETTING_ID  # Add version
-
+        """Reset the session to the default settings from settings.py"""
         if self.is_using_defaults():
-            self._settings = defaults
+            self._settings = dict(self._defaults())
             return
 
-        self.session["app_settings"] = defaults
-        self.modified = True
-        self.save()
+        self._set_overrides({})
 
     def is_home_page(self, url):
         """Check if URL is home page"""
@@ -305,11 +419,11 @@ class UserSessionManager:
         if self.is_using_defaults():
             return self._settings.pop(key, default)
 
-        app_settings = self._get_session_settings()
-        value = app_settings.pop(key, default)
-        self.session["app_settings"] = app_settings
-        self.modified = True
-        self.save()
+        # The key falls back to its default, if it has one
+        value = self.get(key, default)
+        overrides = self._get_overrides()
+        if overrides.pop(key, _MISSING) is not _MISSING:
+            self._set_overrides(overrides)
         return value
 
     def remove_last_breadcrumb(self):
@@ -317,12 +431,9 @@ class UserSessionManager:
         if self.is_using_defaults():
             return
 
-        breadcrumbs = self.session.get("breadcrumbs", [])
-        if breadcrumbs:
-            breadcrumbs.pop()
-            self.session["breadcrumbs"] = breadcrumbs
-            self.modified = True
-            self.save()
+        trail = self._get_breadcrumb_trail()
+        if trail:
+            self._set_breadcrumb_trail(trail[:-1])
 
     def reset_to_defaults(self) -> None:
         """Reset settings to default values from settings.py"""
@@ -346,11 +457,13 @@ class UserSessionManager:
             self._settings[key] = value
             return
 
-        app_settings = self._get_session_settings()
-        app_settings[key] = value
-        self.session["app_settings"] = app_settings
-        self.modified = True
-        self.save()
+        # Only values that differ from the defaults are stored
+        overrides = self._get_overrides()
+        if self._defaults().get(key, _MISSING) == value:
+            overrides.pop(key, None)
+        else:
+            overrides[key] = value
+        self._set_overrides(overrides)
 
     def set_menu_feature(self, feature: str, enabled: bool) -> None:
         """Enable or disable a menu feature"""
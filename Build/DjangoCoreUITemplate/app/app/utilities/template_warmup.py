@@ -0,0 +1,62 @@
+# app/utilities/template_warmup.py
+import logging
+import os
+import time
+from typing import List, NamedTuple, Tuple
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupResult(NamedTuple):
+    compiled: int
+    seconds: float
+    errors: List[Tuple[str, str]]  # (template name, error)
+
+
+def project_template_names(extensions=('.html',)) -> List[str]:
+    """Names of every template under the project's template DIRS"""
+    names = []
+    for template_dir in engines['django'].engine.dirs:
+        for root, dirs, files in os.walk(template_dir):
+            for file in files:
+                if file.endswith(extensions):
+                    names.append(os.path.relpath(os.path.join(root, file), template_dir).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_templates(names=None) -> WarmupResult:
+    """Compile templates into the engine's cached loader.
+
+    Only useful in the cached TEMPLATE_PROFILE, and only in the process that
+    will serve requests: each worker has its own cache.
+    """
+    engine = engines['django']
+    errors = []
+    start = time.perf_counter()
+    names = project_template_names() if names is None else names
+    for name in names:
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as e:
+            errors.append((name, str(e)))
+        except Exception as e:
+            logger.warning(f"Could not compile template {name}: {e}")
+            errors.append((name, str(e)))
+    return WarmupResult(len(names) - len(errors), time.perf_counter() - start, errors)
+
+
+def warm_templates_on_boot():
+    """Warm the cache when WARM_TEMPLATES is on; never stops the worker starting"""
+    if not getattr(settings, 'WARM_TEMPLATES', False):
+        return
+    try:
+        result = warm_templates()
+    except Exception as e:
+        logger.error(f"Template warm-up failed: {e}")
+        return
+    logger.info(f"Compiled {result.compiled} templates in {result.seconds:.2f}s")
+    for name, error in result.errors:
+        logger.warning(f"Template {name} did not compile: {error}")
@@ -16,8 +16,6 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.http import HttpResponse, Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.template import TemplateDoesNotExist
-from django.template.loader import get_template
 from django.utils.decorators import method_decorator
 from django.urls import reverse, reverse_lazy
 from django.views.decorators.http import require_http_methods
@@ -38,11 +36,14 @@ from .forms import (
     InitialSetupForm,
     CustomLoginForm,
 )
-from pathlib import Path
-from .utilities.session_manager import UserSessionManager
-from .utilities.menu_manager import MenuManager
+from .utilities.session_manager import get_session_manager
+from .utilities.menu_manager import MenuManager, filtered_menu_cache
+from .utilities.example_templates import example_templates
+from .utilities.icon_catalogue import ICON_SETS, icon_sets
 from .utilities.email_tests import send_test_email, run_comprehensive_email_test
 from .utilities.mixins import BaseContextMixin
+from .utilities.page_cache import PageCacheMixin
+from .middleware.initial_setup import superuser_exists
 
 import logging
 import datetime
@@ -70,8 +71,8 @@ def with_base_context(view_func):
         return response
     return wrapper
 
-class IconsView(BaseContextMixin, TemplateView):
-    """View for displaying icons"""
+class IconsView(PageCacheMixin, BaseContextMixin, TemplateView):
+    """View for displaying icons from the sprite catalogue (?set=, ?q= and ?page=)"""
     template_name = 'home/ui-icons.html'
 
     def get_context_data(self, **kwargs):
@@ -79,9 +80,12 @@ class IconsView(BaseContextMixin, TemplateView):
         base_context = self.get_base_context(self.request)
         base_context['title'] = f"{base_context['title']}Icons"
         context.update(base_context)
+        icon_set = self.request.GET.get('set', 'free')
+        context['icon_set'] = icon_set if icon_set in ICON_SETS else 'free'
+        context['icon_sets'] = icon_sets().values()
         return context
 
-class HomeView(BaseContextMixin, TemplateView):
+class HomeView(PageCacheMixin, BaseContextMixin, TemplateView):
     """Home page view"""
     template_name = 'base.html'
 
@@ -120,10 +124,12 @@ class DebugView(LoginRequiredMixin, BaseContextMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         base_context = self.get_base_context(self.request)
         base_context['title'] = f"{base_context['title']}Debug"
+        base_context['menu_cache_stats'] = filtered_menu_cache.stats()
+        base_context['session_manager_builds'] = getattr(self.request, 'session_manager_builds', 0)
         context.update(base_context)
         return context    
 
-class ExampleTemplateView(BaseContextMixin, TemplateView):
+class ExampleTemplateView(PageCacheMixin, BaseContextMixin, TemplateView):
     template_name = 'examples/index.html'  # Default template for index
 
     def get_template_names(self):
@@ -133,34 +139,14 @@ class ExampleTemplateView(BaseContextMixin, TemplateView):
         if not template_path:
             return [self.template_name]
             
-        # Otherwise, try to find the specific example template
-        example_template = f"examples/{template_path}.html"
-        try:
-            get_template(example_template)
-            return [example_template]
-        except TemplateDoesNotExist:
+        # Otherwise, look the specific example template up in the index
+        if not example_templates.exists(template_path):
             raise Http404(f"Example template '{template_path}' does not exist")
+        return [f"examples/{template_path}.html"]
 
     def get_example_templates(self):
-        """Get list of all example templates"""
-        templates = []
-        example_dir = Path(settings.BASE_DIR) / 'templates' / 'examples'
-        
-        for root, dirs, files in os.walk(example_dir):
-            for file in files:
-                if file.endswith('.html') and file != 'index.html':  # Skip index.html
-                    rel_path = os.path.relpath(
-                        os.path.join(root, file), 
-                        example_dir
-                    )
-                    template_path = os.path.splitext(rel_path)[0]
-                    templates.append({
-                        'path': template_path,
-                        'name': template_path.replace('/', ' > ').title(),
-                        'url': f"/examples/{template_path}/"
-                    })
-        
-        return sorted(templates, key=lambda x: x['path'])
+        """Get list of all example templates (shared, do not modify)"""
+        return example_templates.listing()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -187,17 +173,7 @@ class ExampleTemplateView(BaseContextMixin, TemplateView):
         """Get the actual content of the template file"""
         if not template_path:
             return None
-            
-        template_file = Path(settings.BASE_DIR) / 'templates' / f"examples/{template_path}.html"
-        try:
-            with open(template_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            print(f"Template file not found: {template_file}")  # Debug
-            return None
-        except Exception as e:
-            print(f"Error reading template: {e}")  # Debug
-            return None
+        return example_templates.source(template_path)
 
 class CustomLoginView(LoginView):
     form_class = CustomLoginForm
@@ -238,7 +214,7 @@ class CustomLogoutView(LogoutView):
 
             try:
                 # Clear session if needed
-                session_manager = UserSessionManager(request)
+                session_manager = get_session_manager(request)
                 session_manager.clear_all()
             except Exception as e:
                 logger.error(f"Error clearing session: {e}")
@@ -588,7 +564,7 @@ class InitialSetupView(FormView):
 
     def dispatch(self, request, *args, **kwargs):
         # Redirect if superuser already exists
-        if User.objects.filter(is_superuser=True).exists():
+        if superuser_exists():
             messages.warning(request, 'Setup has already been completed.')
             return redirect('home')
         return super().dispatch(request, *args, **kwargs)
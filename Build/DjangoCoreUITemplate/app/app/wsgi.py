@@ -6,4 +6,9 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Compile templates before the first request (see TEMPLATE_PROFILE)
+from app.utilities.template_warmup import warm_templates_on_boot  # noqa: E402
+
+warm_templates_on_boot()
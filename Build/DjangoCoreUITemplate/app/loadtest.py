@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Script to compare requests/sec for each session/cache profile.
+Run this script from the command line: python loadtest.py [--requests 300] [profile ...]
+
+Each profile runs in its own process (SESSION_PROFILE is read when settings
+load) against a throwaway SQLite database and cache directory, so your real
+database and sessions are never touched.  Requests go through the full
+middleware stack with Django's test client, logged in as a superuser, so the
+numbers compare profiles with each other rather than a production server.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = ['db', 'cached_db', 'signed_cookies']
+PAGES = ['/dashboard/', '/icons/', '/examples/', '/examples/base/accordion/', '/users/']
+
+
+def setup_django(workdir):
+    """Setup Django against a throwaway database"""
+    project_path = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(project_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    os.environ['DEBUG'] = 'False'
+    os.environ.setdefault('CACHE_LOCATION', os.path.join(workdir, 'cache'))
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'loadtest.sqlite3')
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def run_profile(requests_per_page):
+    """Log in and request every page; prints '<requests> <seconds>'"""
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    User.objects.create_superuser('loadtest', 'loadtest@example.com', 'loadtest-password')
+    client = Client()
+    client.login(username='loadtest', password='loadtest-password')
+
+    for page in PAGES:  # Warm up templates, menus and caches
+        response = client.get(page)
+        if response.status_code != 200:
+            raise RuntimeError(f"{page} returned {response.status_code}")
+
+    start = time.perf_counter()
+    for _ in range(requests_per_page):
+        for page in PAGES:
+            client.get(page)
+    print(requests_per_page * len(PAGES), time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('profiles', nargs='*', default=PROFILES, help=f"Profiles to test: {', '.join(PROFILES)}")
+    parser.add_argument('--requests', type=int, default=300, help='Requests per page (default 300)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with tempfile.TemporaryDirectory() as workdir:
+            setup_django(workdir)
+            run_profile(args.requests)
+        return
+
+    print(f"Pages: {', '.join(PAGES)} ({args.requests} requests each)")
+    for profile in args.profiles:
+        result = subprocess.run(
+            [sys.executable, __file__, '--worker', '--requests', str(args.requests)],
+            env={**os.environ, 'SESSION_PROFILE': profile},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"{profile:<16} failed:\n{result.stderr.strip()}")
+            continue
+        count, seconds = result.stdout.split()[-2:]
+        print(f"{profile:<16} {int(count) / float(seconds):>10.1f} requests/sec")
+
+
+if __name__ == "__main__":
+    main()